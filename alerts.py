@@ -0,0 +1,387 @@
+import argparse
+import json
+import os
+import queue
+import re
+import sqlite3
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+import uuid
+from datetime import datetime
+
+from analysis import DRAWDOWN_BANDS, cached_success_analysis
+from breadth import BreadthTracker, update_universe
+from market_data import PRICE_HISTORY_START
+from price_store import load_bars
+
+ALERT_DB_PATH = os.environ.get('ALERT_DB_PATH', 'alerts.db') # 감시 목록 저장 위치 (SQLite)
+ALERT_CHECK_INTERVAL = int(os.environ.get('ALERT_CHECK_INTERVAL', '300')) # 스케줄러 확인 간격 (초)
+ALERT_WEBHOOK_TIMEOUT = int(os.environ.get('ALERT_WEBHOOK_TIMEOUT', '10'))
+ALERT_QUEUE_MAX_SIZE = int(os.environ.get('ALERT_QUEUE_MAX_SIZE', '10000'))
+ALERT_SPOOL_DIR = os.environ.get('ALERT_SPOOL_DIR', 'alert_spool') # 'queue' 알림 대상의 JSON Lines 파일 위치 (대상에는 파일 이름만 지정)
+# 웹훅을 보낼 수 있는 호스트 (쉼표로 구분, 비어 있으면 웹훅 사용 안 함)
+ALERT_WEBHOOK_ALLOWED_HOSTS = {host.strip().lower() for host in os.environ.get('ALERT_WEBHOOK_ALLOWED_HOSTS', '').split(',')
+                               if host.strip()}
+
+alert_queue = queue.Queue(maxsize=ALERT_QUEUE_MAX_SIZE) # 'queue' 알림 대상이 쓰는 프로세스 내 큐
+
+
+class LogSink:
+    """알림을 로그(표준 출력)로 남기는 대상"""
+
+    def __init__(self, target=None):
+        self.target = target
+
+    def send(self, alert):
+        print(f"[ALERT] {alert['symbol']} 52주 신고점 대비 {alert['drawdown_pct']:.2f}% 하락 "
+              f"({alert['band']}% 구간, 성공률 {alert['successRate']}%, 기준일 {alert['as_of']})")
+
+
+class QueueSink:
+    """파일 이름이 지정되면 ALERT_SPOOL_DIR 안의 JSON Lines 파일에 추가하고, 프로세스 내 큐에도 넣는 대상 (큐가 가득 차면 큐에만 넣지 않음)"""
+
+    def __init__(self, target=None):
+        self.spool_path = None
+        if target:
+            # 임의 경로에 쓰지 않도록 디렉터리 없는 파일 이름만 허용
+            if not re.fullmatch(r'[A-Za-z0-9_-][A-Za-z0-9._-]*', target):
+                raise ValueError("큐 알림 대상에는 경로 없이 파일 이름(영문, 숫자, . _ -)만 지정할 수 있습니다.")
+            self.spool_path = os.path.join(ALERT_SPOOL_DIR, target)
+        self._lock = threading.Lock()
+
+    def send(self, alert):
+        if self.spool_path:
+            os.makedirs(ALERT_SPOOL_DIR, exist_ok=True)
+            with self._lock, open(self.spool_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(alert, ensure_ascii=False) + '\n')
+        try:
+            alert_queue.put_nowait(alert)
+        except queue.Full:
+            # 큐를 소비하는 쪽이 없거나 느린 경우. 파일에는 이미 기록했으므로 알림 발송은 성공으로 처리
+            print(f"알림 큐가 가득 차 큐에 넣지 못함 ({alert['symbol']}, 기준일 {alert['as_of']})")
+
+
+class _NoRedirectHandler(urllib.request.HTTPRedirectHandler):
+    """허용 목록 밖의 호스트로 넘어가지 않도록 웹훅 응답의 리다이렉트를 따라가지 않음"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+_webhook_opener = urllib.request.build_opener(_NoRedirectHandler)
+
+
+class WebhookSink:
+    """알림을 JSON으로 웹훅 URL에 POST하는 대상 (ALERT_WEBHOOK_ALLOWED_HOSTS에 있는 호스트만 허용)"""
+
+    def __init__(self, target):
+        if not target or not target.startswith(('http://', 'https://')):
+            raise ValueError("웹훅 알림에는 http(s) URL이 필요합니다.")
+        try:
+            host = urllib.parse.urlsplit(target).hostname
+        except ValueError:
+            host = None
+        if not host or host.lower() not in ALERT_WEBHOOK_ALLOWED_HOSTS:
+            raise ValueError(f"허용되지 않은 웹훅 호스트입니다: {host} (ALERT_WEBHOOK_ALLOWED_HOSTS에 등록 필요)")
+        self.url = target
+
+    def send(self, alert):
+        data = json.dumps(alert, ensure_ascii=False).encode('utf-8')
+        req = urllib.request.Request(self.url, data=data, method='POST',
+                                     headers={'Content-Type': 'application/json'})
+        with _webhook_opener.open(req, timeout=ALERT_WEBHOOK_TIMEOUT) as response:
+            response.read()
+
+
+# 알림 대상 이름 -> 생성 함수(target). register_sink()로 새 대상을 추가할 수 있음
+SINKS = {
+    'log': LogSink,
+    'queue': QueueSink,
+    'webhook': WebhookSink,
+}
+
+
+def register_sink(name, factory):
+    SINKS[name] = factory
+
+
+def public_watch(watch):
+    """API 응답용 감시 조건 (웹훅 URL 등 알림 대상 설정은 제외)"""
+    return {key: value for key, value in watch.items() if key != 'sink_target'}
+
+
+class WatchStore:
+    """(종목, 하락률 구간, 최소 성공률) 감시 목록을 SQLite에 저장 (여러 워커/스케줄러 프로세스가 함께 사용)"""
+
+    def __init__(self, path=ALERT_DB_PATH):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS watches (
+                    id TEXT PRIMARY KEY,
+                    symbol TEXT NOT NULL,
+                    band INTEGER NOT NULL,
+                    min_success_rate REAL NOT NULL,
+                    target_increase_pct REAL NOT NULL,
+                    sink TEXT NOT NULL,
+                    sink_target TEXT,
+                    created_at TEXT NOT NULL,
+                    armed INTEGER NOT NULL DEFAULT 1,
+                    last_fired_at TEXT,
+                    last_fired_as_of TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS watches_symbol ON watches (symbol)")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def add_watch(self, symbol, band, min_success_rate=0, target_increase_pct=3, sink='log', sink_target=None):
+        """감시 조건 등록 (입력 오류는 ValueError)"""
+        symbol = (symbol or '').strip().upper()
+        band = int(band)
+        min_success_rate = float(min_success_rate)
+        target_increase_pct = float(target_increase_pct)
+        if not symbol:
+            raise ValueError("종목 심볼을 입력해주세요.")
+        if band not in DRAWDOWN_BANDS:
+            raise ValueError(f"하락률 구간은 {DRAWDOWN_BANDS.start}~{DRAWDOWN_BANDS[-1]} 사이 {DRAWDOWN_BANDS.step}% 단위로 입력해주세요.")
+        if not (0 <= min_success_rate <= 100):
+            raise ValueError("최소 성공률은 0 이상 100 이하로 입력해주세요.")
+        if not (0 < target_increase_pct <= 100):
+            raise ValueError("목표 상승률은 0% 초과 100% 이하로 입력해주세요.")
+        if sink not in SINKS:
+            raise ValueError(f"지원하지 않는 알림 대상입니다: {sink} ({', '.join(SINKS)} 중 선택)")
+        SINKS[sink](sink_target) # 대상 설정(예: 웹훅 URL) 검증
+
+        watch = {
+            'id': uuid.uuid4().hex,
+            'symbol': symbol,
+            'band': band,
+            'min_success_rate': min_success_rate,
+            'target_increase_pct': target_increase_pct,
+            'sink': sink,
+            'sink_target': sink_target,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'armed': 1,
+            'last_fired_at': None,
+            'last_fired_as_of': None,
+        }
+        with self._connect() as conn:
+            conn.execute("INSERT INTO watches VALUES (:id, :symbol, :band, :min_success_rate, :target_increase_pct, "
+                         ":sink, :sink_target, :created_at, :armed, :last_fired_at, :last_fired_as_of)", watch)
+        return watch
+
+    def remove_watch(self, watch_id):
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM watches WHERE id = ?", (watch_id,)).rowcount > 0
+
+    def list_watches(self, symbol=None, limit=1000):
+        with self._connect() as conn:
+            if symbol:
+                rows = conn.execute("SELECT * FROM watches WHERE symbol = ? ORDER BY created_at LIMIT ?",
+                                    (symbol.upper(), limit))
+            else:
+                rows = conn.execute("SELECT * FROM watches ORDER BY created_at LIMIT ?", (limit,))
+            return [dict(row) for row in rows]
+
+    def watches_for(self, symbol):
+        return self.list_watches(symbol, limit=-1)
+
+    def watched_symbols(self):
+        with self._connect() as conn:
+            return {row[0] for row in conn.execute("SELECT DISTINCT symbol FROM watches")}
+
+    def update_states(self, updates):
+        """(armed, last_fired_at, last_fired_as_of, id) 목록을 한 트랜잭션으로 반영"""
+        if not updates:
+            return
+        with self._connect() as conn:
+            conn.executemany("UPDATE watches SET armed = ?, last_fired_at = ?, last_fired_as_of = ? WHERE id = ?", updates)
+
+
+def snapshot_version(snapshot):
+    """알림 평가 기준이 되는 스냅샷 값 (이 값이 바뀐 종목만 다시 평가)"""
+    return snapshot['as_of'], snapshot['close'], snapshot['high_52_week']
+
+
+class AlertEngine:
+    """새 봉이 들어온 종목의 감시 조건만 평가해 알림 발송 (하락률은 BreadthTracker 스냅샷 재사용)
+
+    감시 종목은 tickers.json 밖의 종목일 수도 있으므로 /breadth 집계에 섞이지 않도록 엔진 전용 트래커를 사용.
+    refresh()의 반환값(그 호출에서 다시 계산한 종목)에 의존하지 않고,
+    종목별로 마지막으로 평가한 스냅샷 값을 따로 기억해 현재 스냅샷과 비교함
+    """
+
+    def __init__(self, watch_store, tracker=None):
+        self.watch_store = watch_store
+        self.tracker = tracker if tracker is not None else BreadthTracker([]) # 감시 중인 종목만 추적
+        self._sinks = {} # (이름, 대상) -> 알림 대상 인스턴스
+        self._evaluated = {} # 심볼 -> 마지막으로 평가를 마친 스냅샷 값
+        self._lock = threading.Lock()
+
+    def _sink(self, name, target):
+        key = (name, target)
+        if key not in self._sinks:
+            self._sinks[key] = SINKS[name](target)
+        return self._sinks[key]
+
+    def _band_stats(self, symbol, band, target_increase_pct):
+        """분석 화면과 같은 기준(2020년 이후 일봉)의 해당 구간 성공률 통계"""
+        df = load_bars(symbol)
+        df = df[df.index >= PRICE_HISTORY_START]
+        if df.empty:
+            return None
+        return cached_success_analysis(symbol, df, target_increase_pct / 100).get(band)
+
+    def check(self):
+        """가격 저장소에서 바뀐 종목 중 감시 중인 종목만 평가. 발송한 알림 목록 반환"""
+        with self._lock:
+            watched = self.watch_store.watched_symbols()
+            for symbol in watched:
+                self.tracker.track(symbol)
+            self.tracker.refresh()
+            fired = []
+            for symbol in sorted(watched):
+                snapshot = self.tracker.snapshot(symbol)
+                if snapshot is None or self._evaluated.get(symbol) == snapshot_version(snapshot):
+                    continue
+                fired.extend(self.evaluate_symbol(symbol))
+            for symbol in set(self._evaluated) - watched: # 감시가 모두 삭제된 종목
+                del self._evaluated[symbol]
+            return fired
+
+    def evaluate_symbol(self, symbol):
+        """한 종목의 감시 조건 평가. 구간에 도달하면 한 번만 알리고, 구간 위로 회복하면 다시 감시"""
+        snapshot = self.tracker.snapshot(symbol)
+        if snapshot is None:
+            return []
+
+        fired = []
+        updates = []
+        failed = False
+        for watch in self.watch_store.watches_for(symbol):
+            if snapshot['drawdown_pct'] < watch['band']:
+                if not watch['armed']:
+                    updates.append((1, watch['last_fired_at'], watch['last_fired_as_of'], watch['id']))
+                continue
+            if not watch['armed']:
+                continue
+
+            band_stats = self._band_stats(symbol, watch['band'], watch['target_increase_pct'])
+            success_rate = band_stats['successRate'] if band_stats else None
+            if success_rate is None or success_rate < watch['min_success_rate']:
+                continue
+
+            alert = {
+                'watch_id': watch['id'],
+                'symbol': symbol,
+                'band': watch['band'],
+                'drawdown_pct': snapshot['drawdown_pct'],
+                'close': snapshot['close'],
+                'high_52_week': snapshot['high_52_week'],
+                'as_of': snapshot['as_of'],
+                'target_increase_pct': watch['target_increase_pct'],
+                'min_success_rate': watch['min_success_rate'],
+                **band_stats,
+            }
+            try:
+                self._sink(watch['sink'], watch['sink_target']).send(alert)
+            except Exception as e:
+                print(f"알림 발송 실패 ({watch['sink']}, {symbol}): {e}") # 다음 확인 때 다시 시도
+                failed = True
+                continue
+            updates.append((0, datetime.now().isoformat(timespec='seconds'), snapshot['as_of'], watch['id']))
+            fired.append(alert)
+
+        self.watch_store.update_states(updates)
+        if not failed:
+            self._evaluated[symbol] = snapshot_version(snapshot)
+        return fired
+
+    def run_once(self, update=True):
+        """감시 종목의 새 봉을 가격 저장소에 추가한 뒤 평가"""
+        if update:
+            update_universe(sorted(self.watch_store.watched_symbols()))
+        return self.check()
+
+    def run_forever(self, interval=ALERT_CHECK_INTERVAL, update=True, stop_event=None):
+        while stop_event is None or not stop_event.is_set():
+            started = time.monotonic()
+            try:
+                self.run_once(update=update)
+            except Exception as e:
+                print(f"알림 확인 중 오류 발생: {e}")
+            wait = max(0, interval - (time.monotonic() - started))
+            if stop_event is not None:
+                stop_event.wait(wait)
+            else:
+                time.sleep(wait)
+
+
+def start_scheduler(engine, interval=ALERT_CHECK_INTERVAL):
+    """백그라운드 스레드에서 주기적으로 알림 확인 (중지용 Event 반환)"""
+    stop_event = threading.Event()
+    thread = threading.Thread(target=engine.run_forever, kwargs={'interval': interval, 'stop_event': stop_event},
+                              name='alert-scheduler', daemon=True)
+    thread.start()
+    return stop_event
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="하락률 구간 도달 알림 감시 목록 관리 및 스케줄러")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    add_parser = subparsers.add_parser('add', help="감시 조건 등록")
+    add_parser.add_argument('symbol')
+    add_parser.add_argument('--band', type=int, required=True, help="하락률 구간 (%%, 5 단위)")
+    add_parser.add_argument('--min-success-rate', type=float, default=0)
+    add_parser.add_argument('--target', type=float, default=3, help="성공률 계산에 쓸 목표 상승률 (%%)")
+    add_parser.add_argument('--sink', default='log')
+    add_parser.add_argument('--sink-target', help="웹훅 URL 또는 큐 파일 이름 (ALERT_SPOOL_DIR 안에 생성)")
+
+    remove_parser = subparsers.add_parser('remove', help="감시 조건 삭제")
+    remove_parser.add_argument('watch_id')
+
+    list_parser = subparsers.add_parser('list', help="감시 목록 출력")
+    list_parser.add_argument('--symbol')
+
+    run_parser = subparsers.add_parser('run', help="알림 스케줄러 실행")
+    run_parser.add_argument('--interval', type=int, default=ALERT_CHECK_INTERVAL)
+    run_parser.add_argument('--once', action='store_true', help="한 번만 확인하고 종료")
+    run_parser.add_argument('--no-update', action='store_true', help="가격 저장소 갱신 없이 평가만 수행")
+
+    args = parser.parse_args(argv)
+    watch_store = WatchStore()
+
+    if args.command == 'add':
+        try:
+            watch = watch_store.add_watch(args.symbol, args.band, args.min_success_rate, args.target,
+                                          args.sink, args.sink_target)
+        except ValueError as e:
+            parser.error(str(e))
+        print(json.dumps(watch, ensure_ascii=False))
+    elif args.command == 'remove':
+        if not watch_store.remove_watch(args.watch_id):
+            print(f"감시 조건을 찾을 수 없습니다: {args.watch_id}", file=sys.stderr)
+            return 1
+    elif args.command == 'list':
+        for watch in watch_store.list_watches(args.symbol, limit=-1):
+            print(json.dumps(watch, ensure_ascii=False))
+    elif args.command == 'run':
+        engine = AlertEngine(watch_store)
+        if args.once:
+            fired = engine.run_once(update=not args.no_update)
+            print(f"발송한 알림: {len(fired)}개", file=sys.stderr)
+        else:
+            engine.run_forever(interval=args.interval, update=not args.no_update)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
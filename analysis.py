@@ -0,0 +1,342 @@
+import math
+import os
+import pickle
+from datetime import datetime
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from cache import ByteLRUCache, frame_version
+
+TRADING_DAYS_PER_YEAR = 252
+DRAWDOWN_BANDS = range(5, 95, 5) # 성공률을 계산할 하락률 구간 (%)
+
+BOOTSTRAP_STATS_KEYS = ('bootstrapSuccessRateLow', 'bootstrapSuccessRateHigh', 'bootstrapAvgDaysLow', 'bootstrapAvgDaysHigh')
+EMPTY_SUCCESS_STATS = {'successRate': None, 'successCases': None, 'failureCases': None, 'totalCases': None, 'avgDays': None,
+                       'successRateLow': None, 'successRateHigh': None, **dict.fromkeys(BOOTSTRAP_STATS_KEYS)}
+
+WILSON_Z = 1.96 # 95% 신뢰구간
+BOOTSTRAP_SEED = 52 # 같은 데이터에 대해 항상 같은 부트스트랩 결과가 나오도록 고정 (결과 캐시와 일관성 유지)
+MAX_BOOTSTRAP_RESAMPLES = 10000
+
+ANALYSIS_CACHE_MAX_BYTES = int(os.environ.get('ANALYSIS_CACHE_MAX_BYTES', str(64 * 1024 * 1024))) # 분석 결과 캐시 최대 크기
+
+# (심볼, 목표 상승률, 해상도, 데이터 버전) -> (52주 통계, 가격 레벨 목록) 또는 하락률 구간별 성공률
+analysis_cache = ByteLRUCache(ANALYSIS_CACHE_MAX_BYTES, sizeof=lambda value: len(pickle.dumps(value)))
+
+
+def compute_52_week_stats(df, bars_per_year=TRADING_DAYS_PER_YEAR):
+    """52주 신고점/전저점, 올해 최저 종가, 현재가 계산 (bars_per_year: 1년에 해당하는 봉 수)"""
+    # 52주 신고점, 52주 전저점 계산
+    if len(df) >= bars_per_year: # 최소 1년치(일봉 기준 252 거래일) 데이터가 있을 경우
+        high_52_week = df['High'].tail(bars_per_year).max()
+        low_52_week_close = df['Close'].tail(bars_per_year).min()
+    else: # 1년치 데이터가 없으면 전체 기간 중 최고/최저 사용
+        high_52_week = df['High'].max()
+        low_52_week_close = df['Close'].min()
+
+    # 올해 최저 종가 계산
+    current_year = datetime.now().year
+    df_current_year = df.loc[df.index.year == current_year]
+    if not df_current_year.empty:
+        low_this_year_close = df_current_year['Close'].min()
+    else: # 올해 데이터가 없으면 전체 데이터 중 최저 사용 (대체)
+        low_this_year_close = df['Close'].min()
+
+    return {
+        'high_52_week': high_52_week,
+        'low_52_week_close': low_52_week_close,
+        'low_this_year_close': low_this_year_close,
+        'current_price': df['Close'].iloc[-1],
+    }
+
+def compute_drawdown(df, bars_per_year=TRADING_DAYS_PER_YEAR):
+    """종가/고가 배열과 롤링 52주 신고점 대비 하락률(당일, 전일) 배열 계산"""
+    close = df['Close'].to_numpy(dtype=float)
+    high = df['High'].to_numpy(dtype=float)
+    # 52주 신고점 계산 (롤링 윈도우)
+    rolling_high = df['High'].rolling(window=bars_per_year, min_periods=1).max().to_numpy(dtype=float)
+    # 52주 신고점 대비 하락률 계산
+    drawdown = (close - rolling_high) / rolling_high
+    prev_drawdown = np.concatenate(([np.nan], drawdown[:-1]))
+    return close, high, drawdown, prev_drawdown
+
+def find_band_entries(drawdown, prev_drawdown, drawdown_pct_val):
+    """특정 하락률에 처음 도달하는 시점(매수 시점)의 위치 배열"""
+    drawdown_threshold = -drawdown_pct_val / 100
+    return np.flatnonzero((drawdown <= drawdown_threshold) & (prev_drawdown > drawdown_threshold))
+
+def measure_target_hits(close, high, buy_idx, target_increase_pct_ratio, horizon=TRADING_DAYS_PER_YEAR):
+    """매수 시점별로 horizon 봉 이내 목표 가격(고가 기준) 달성 여부와 달성까지 걸린 봉 수 계산"""
+    if len(buy_idx) == 0:
+        return np.zeros(0, dtype=bool), np.zeros(0, dtype=int)
+
+    target_prices = close[buy_idx] * (1 + target_increase_pct_ratio) # 실제 비율 사용
+    # windows[i] = high[i + 1:i + 1 + horizon] (데이터 끝 이후는 -inf로 채워 달성하지 못한 것으로 처리)
+    padded_high = np.concatenate((high[1:], np.full(horizon, -np.inf)))
+    windows = sliding_window_view(padded_high, horizon)[buy_idx]
+    reached = windows >= target_prices[:, None]
+    hit = reached.any(axis=1)
+    days_to_achieve = reached.argmax(axis=1) + 1 # 달성까지 걸린 봉 수
+    return hit, days_to_achieve
+
+def wilson_interval(success_cases, total_cases, z=WILSON_Z):
+    """성공률의 Wilson 신뢰구간 (%, 표본이 없으면 (None, None))"""
+    if total_cases == 0:
+        return None, None
+    p = success_cases / total_cases
+    denominator = 1 + z ** 2 / total_cases
+    center = (p + z ** 2 / (2 * total_cases)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / total_cases + z ** 2 / (4 * total_cases ** 2)) / denominator
+    return round(max(center - half_width, 0.0) * 100, 1), round(min(center + half_width, 1.0) * 100, 1)
+
+def block_bootstrap_band(hit, days_to_achieve, n_resamples, rng, block_length=None):
+    """매수 시점(시간순)을 연속 블록 단위로 재표본추출해 성공률/평균 달성일의 95% 구간 계산
+
+    재표본은 (n_resamples, 사건 수) 인덱스 행렬로 한 번에 만들어 반복문 없이 계산한다.
+    """
+    total_cases = len(hit)
+    if total_cases == 0 or n_resamples <= 0:
+        return dict.fromkeys(BOOTSTRAP_STATS_KEYS)
+
+    # 인접한 매수 시점은 서로 상관되어 있으므로 약 n^(1/3) 길이의 블록으로 묶어서 추출
+    block_length = min(block_length or max(1, round(total_cases ** (1 / 3))), total_cases)
+    n_blocks = -(-total_cases // block_length)
+    starts = rng.integers(0, total_cases - block_length + 1, size=(n_resamples, n_blocks))
+    resample_idx = (starts[:, :, None] + np.arange(block_length)).reshape(n_resamples, -1)[:, :total_cases]
+
+    resampled_hit = hit[resample_idx]
+    success_counts = resampled_hit.sum(axis=1)
+    success_rates = success_counts / total_cases * 100
+    day_sums = np.where(resampled_hit, days_to_achieve[resample_idx], 0).sum(axis=1)
+    avg_days = day_sums[success_counts > 0] / success_counts[success_counts > 0]
+
+    rate_low, rate_high = np.percentile(success_rates, [2.5, 97.5])
+    days_low, days_high = np.percentile(avg_days, [2.5, 97.5]) if avg_days.size else (None, None)
+    return {
+        'bootstrapSuccessRateLow': round(float(rate_low), 1),
+        'bootstrapSuccessRateHigh': round(float(rate_high), 1),
+        'bootstrapAvgDaysLow': round(float(days_low), 1) if days_low is not None else None,
+        'bootstrapAvgDaysHigh': round(float(days_high), 1) if days_high is not None else None,
+    }
+
+def summarize_band(hit, days_to_achieve, bootstrap_resamples=0, rng=None):
+    """하락률 구간 하나의 성공률/성공·실패 횟수/평균 달성일 요약 (Wilson 구간, 선택적으로 부트스트랩 구간 포함)"""
+    total_cases = len(hit)
+    success_cases = int(hit.sum())
+    failure_cases = total_cases - success_cases
+    success_rate = (success_cases / total_cases * 100) if total_cases > 0 else 0
+    avg_days = float(days_to_achieve[hit].mean()) if success_cases else None
+    success_rate_low, success_rate_high = wilson_interval(success_cases, total_cases)
+    if bootstrap_resamples:
+        bootstrap_stats = block_bootstrap_band(hit, days_to_achieve, bootstrap_resamples, rng)
+    else:
+        bootstrap_stats = dict.fromkeys(BOOTSTRAP_STATS_KEYS)
+    return {
+        'successRate': round(success_rate, 1),
+        'successCases': success_cases,
+        'failureCases': failure_cases,
+        'totalCases': total_cases,
+        'avgDays': round(avg_days, 1) if avg_days else None,
+        'successRateLow': success_rate_low,
+        'successRateHigh': success_rate_high,
+        **bootstrap_stats,
+    }
+
+def compute_success_analysis(df, target_increase_pct_ratio, bars_per_year=TRADING_DAYS_PER_YEAR, bootstrap_resamples=0):
+    """하락률 구간(5% 단위)별 목표 상승률 달성 성공률 계산 (매수 후 1년 = bars_per_year 봉 이내 기준)"""
+    close, high, drawdown, prev_drawdown = compute_drawdown(df, bars_per_year)
+    rng = np.random.default_rng(BOOTSTRAP_SEED) if bootstrap_resamples else None
+
+    success_analysis_data = {} 
+
+    # 5% 단위로 하락률 구간 설정 (0%는 제외하고 5%부터 시작)
+    for drawdown_pct_val in DRAWDOWN_BANDS: 
+        buy_idx = find_band_entries(drawdown, prev_drawdown, drawdown_pct_val)
+        hit, days_to_achieve = measure_target_hits(close, high, buy_idx, target_increase_pct_ratio, bars_per_year)
+        success_analysis_data[drawdown_pct_val] = summarize_band(hit, days_to_achieve, bootstrap_resamples, rng)
+
+    return success_analysis_data
+
+def extract_band_events(df, target_increase_pct_ratio, bars_per_year=TRADING_DAYS_PER_YEAR):
+    """모든 하락률 구간의 매수 시점을 열 단위 배열(band, date, hit, days)로 추출 (여러 종목을 합쳐 집계할 때 사용)"""
+    close, high, drawdown, prev_drawdown = compute_drawdown(df, bars_per_year)
+    dates = df.index.to_numpy()
+
+    bands, event_dates, hits, days = [], [], [], []
+    for drawdown_pct_val in DRAWDOWN_BANDS:
+        buy_idx = find_band_entries(drawdown, prev_drawdown, drawdown_pct_val)
+        hit, days_to_achieve = measure_target_hits(close, high, buy_idx, target_increase_pct_ratio, bars_per_year)
+        bands.append(np.full(len(buy_idx), drawdown_pct_val, dtype=np.int16))
+        event_dates.append(dates[buy_idx])
+        hits.append(hit)
+        days.append(days_to_achieve.astype(np.int32))
+
+    return {
+        'band': np.concatenate(bands),
+        'date': np.concatenate(event_dates),
+        'hit': np.concatenate(hits),
+        'days': np.concatenate(days),
+    }
+
+def build_price_levels(stats, success_analysis_data):
+    """표에 표시할 가격 레벨 목록 구성 (표준 하락률 + 현재가/52주 전저점/올해 최저)"""
+    high_52_week = stats['high_52_week']
+    current_price = stats['current_price']
+    low_52_week_close = stats['low_52_week_close']
+    low_this_year_close = stats['low_this_year_close']
+
+    actual_percent_drop = (1 - current_price / high_52_week) * 100 if high_52_week else 0
+
+    # 52주 전저점 하락률 계산
+    max_drop_52_week_val = (1 - low_52_week_close / high_52_week) * 100 if high_52_week and low_52_week_close else 0
+    max_drop_52_week_price = low_52_week_close
+
+    # 올해 최저 하락률 계산 (52주 신고점 대비)
+    max_drop_this_year_val = (1 - low_this_year_close / high_52_week) * 100 if high_52_week and low_this_year_close else 0
+    max_drop_this_year_price = low_this_year_close
+
+    # 표시할 가격 레벨 데이터 구성
+    price_levels_to_display = []
+
+    # 0% 하락률 (신고점) 데이터 추가
+    price_levels_to_display.append({
+        "percent_drop": 0,
+        "target_price": high_52_week,
+        "is_current": False,
+        "is_max_drop_1_year": False,
+        "is_max_drop_this_year": False,
+        **success_analysis_data.get(0, EMPTY_SUCCESS_STATS)
+    })
+
+    # 표준 하락률 레벨 추가 (5% 단위)
+    for percent_drop_val in range(5, 81, 5):
+        target_price_level = high_52_week * (1 - percent_drop_val / 100)
+        price_levels_to_display.append({
+            "percent_drop": float(percent_drop_val), # 소수점 처리
+            "target_price": round(target_price_level, 2),
+            "is_current": False,
+            "is_max_drop_1_year": False,
+            "is_max_drop_this_year": False,
+            **success_analysis_data.get(percent_drop_val, EMPTY_SUCCESS_STATS)
+        })
+    
+    # 현재가 데이터
+    current_price_data = {
+        "percent_drop": actual_percent_drop,
+        "target_price": current_price,
+        "is_current": True,
+        "is_max_drop_1_year": False,
+        "is_max_drop_this_year": False,
+        **EMPTY_SUCCESS_STATS
+    }
+
+    # 52주 전저점 데이터
+    max_drop_52_week_data = {
+        "percent_drop": max_drop_52_week_val,
+        "target_price": max_drop_52_week_price,
+        "is_current": False,
+        "is_max_drop_1_year": True,
+        "is_max_drop_this_year": False,
+        **EMPTY_SUCCESS_STATS
+    }
+
+    # 올해 최저 하락 데이터
+    max_drop_this_year_data = { 
+        "percent_drop": max_drop_this_year_val,
+        "target_price": max_drop_this_year_price,
+        "is_current": False,
+        "is_max_drop_1_year": False,
+        "is_max_drop_this_year": True, 
+        **EMPTY_SUCCESS_STATS
+    }
+
+    # 특별한 가격 레벨들을 삽입 (중복 방지 및 순서 유지)
+    # 현재가가 0% 하락률보다 크거나 같고, 첫 번째 표준 하락률보다 작을 경우 0%와 5% 사이에 삽입
+    if 0 <= actual_percent_drop < 5:
+        # 0% 하락률 바로 다음에 현재가 삽입
+        price_levels_to_display.insert(1, current_price_data) 
+    else:
+        # 적절한 위치에 삽입 (이미 존재하는 하락률과 겹치지 않게)
+        inserted = False
+        for i in range(1, len(price_levels_to_display)):
+            if price_levels_to_display[i-1]["percent_drop"] < actual_percent_drop <= price_levels_to_display[i]["percent_drop"]:
+                price_levels_to_display.insert(i, current_price_data)
+                inserted = True
+                break
+        if not inserted: # 모든 표준 레벨보다 클 경우 마지막에 추가
+            price_levels_to_display.append(current_price_data)
+
+    # 52주 전저점 데이터 삽입 (현재가와 겹치지 않게)
+    inserted = False
+    for i in range(len(price_levels_to_display)):
+        if price_levels_to_display[i]["percent_drop"] == max_drop_52_week_data["percent_drop"] and price_levels_to_display[i].get("is_max_drop_1_year") == True:
+            inserted = True # 이미 같은 52주 전저점 데이터가 있음 (겹치는 5% 간격에 포함되어)
+            break
+        if price_levels_to_display[i]["percent_drop"] < max_drop_52_week_data["percent_drop"]:
+            if i + 1 < len(price_levels_to_display) and price_levels_to_display[i+1]["percent_drop"] > max_drop_52_week_data["percent_drop"]:
+                price_levels_to_display.insert(i+1, max_drop_52_week_data)
+                inserted = True
+                break
+        elif i == 0 and max_drop_52_week_data["percent_drop"] < price_levels_to_display[0]["percent_drop"]: # 0%보다 작은 경우 (이런 경우는 거의 없겠지만)
+            price_levels_to_display.insert(0, max_drop_52_week_data)
+            inserted = True
+            break
+    if not inserted: # 아직 삽입되지 않았다면 맨 뒤에 추가
+        price_levels_to_display.append(max_drop_52_week_data)
+
+    # 올해 최저 하락률 데이터 삽입 (다른 특별 행들과 겹치지 않게)
+    inserted = False
+    for i in range(len(price_levels_to_display)):
+        if price_levels_to_display[i]["percent_drop"] == max_drop_this_year_data["percent_drop"] and price_levels_to_display[i].get("is_max_drop_this_year") == True:
+            inserted = True # 이미 같은 올해 최저 하락률 데이터가 있음
+            break
+        if price_levels_to_display[i]["percent_drop"] < max_drop_this_year_data["percent_drop"]:
+            if i + 1 < len(price_levels_to_display) and price_levels_to_display[i+1]["percent_drop"] > max_drop_this_year_data["percent_drop"]:
+                price_levels_to_display.insert(i+1, max_drop_this_year_data)
+                inserted = True
+                break
+        elif i == 0 and max_drop_this_year_data["percent_drop"] < price_levels_to_display[0]["percent_drop"]:
+            price_levels_to_display.insert(0, max_drop_this_year_data)
+            inserted = True
+            break
+    if not inserted: # 아직 삽입되지 않았다면 맨 뒤에 추가
+        price_levels_to_display.append(max_drop_this_year_data)
+
+
+    # 최종적으로 하락률 기준으로 정렬
+    price_levels_to_display.sort(key=lambda x: x['percent_drop'])
+    
+    # 음수 하락률 (즉, 신고점보다 높은 가격)은 0으로 표시
+    for item in price_levels_to_display:
+        if item['percent_drop'] < 0:
+            item['percent_drop'] = 0.00
+
+    return price_levels_to_display
+
+def analyze_stock(df, target_increase_pct_ratio, bars_per_year=TRADING_DAYS_PER_YEAR, bootstrap_resamples=0):
+    """52주 통계와 표에 표시할 가격 레벨(성공률 포함)을 함께 계산"""
+    stats = compute_52_week_stats(df, bars_per_year)
+    if not (stats['high_52_week'] and stats['current_price']):
+        return stats, []
+
+    success_analysis_data = compute_success_analysis(df, target_increase_pct_ratio, bars_per_year, bootstrap_resamples)
+    return stats, build_price_levels(stats, success_analysis_data)
+
+def cached_analyze_stock(stock_symbol, df, target_increase_pct_ratio, bars_per_year=TRADING_DAYS_PER_YEAR, bootstrap_resamples=0):
+    """analyze_stock 결과를 데이터 버전(기간, 행 수, 마지막 봉 값)과 해상도별로 캐시해 재사용"""
+    cache_key = (stock_symbol, f"{target_increase_pct_ratio:g}", bars_per_year, bootstrap_resamples, frame_version(df))
+    result = analysis_cache.get(cache_key)
+    if result is None:
+        result = analyze_stock(df, target_increase_pct_ratio, bars_per_year, bootstrap_resamples)
+        analysis_cache.set(cache_key, result)
+    return result
+
+def cached_success_analysis(stock_symbol, df, target_increase_pct_ratio, bars_per_year=TRADING_DAYS_PER_YEAR):
+    """compute_success_analysis 결과를 데이터 버전별로 캐시해 재사용 (가격 레벨 구성 없이 구간 통계만 필요할 때)"""
+    cache_key = ('bands', stock_symbol, f"{target_increase_pct_ratio:g}", bars_per_year, frame_version(df))
+    result = analysis_cache.get(cache_key)
+    if result is None:
+        result = compute_success_analysis(df, target_increase_pct_ratio, bars_per_year)
+        analysis_cache.set(cache_key, result)
+    return result
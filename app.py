@@ -1,41 +1,44 @@
-from flask import Flask, render_template, request, jsonify
-import yfinance as yf
-import pandas as pd
-from datetime import datetime, timedelta
-import numpy as np
-import json
+from flask import Flask, render_template, request, jsonify, make_response, Response, stream_with_context
+import os
+import hashlib
+
+from cache import ByteLRUCache, frame_version
+from market_data import (PRICE_CACHE_TTL, RESOLUTIONS, fetch_price_history, fetch_stock_profile,
+                         get_resampled_bars, load_tickers)
+from price_store import fetch_full_history
+from breadth import BreadthTracker
+from alerts import AlertEngine, WatchStore, public_watch, start_scheduler
+from analysis import MAX_BOOTSTRAP_RESAMPLES, cached_analyze_stock
+from export import (EXPORT_FORMATS, MAX_EXPORT_SYMBOLS, iter_export, parquet_available,
+                    parse_symbol_list, top_ranked_symbols)
+from peers import MAX_PEER_SYMBOLS, pooled_analysis
+from intraday import INTRADAY_INTERVALS, get_live_snapshot
 
 app = Flask(__name__)
 
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', str(32 * 1024 * 1024))) # 렌더링 결과 캐시 최대 크기
+
+RESPONSE_CACHE_MAX_AGE = int(os.environ.get('RESPONSE_CACHE_MAX_AGE', str(PRICE_CACHE_TTL))) # 렌더링 결과 최대 보관 시간 (초, 종목 정보 재조회 주기)
+response_cache = ByteLRUCache(RESPONSE_CACHE_MAX_BYTES, max_age=RESPONSE_CACHE_MAX_AGE) # (심볼, 목표 상승률, 분석 기간, 해상도, 데이터 버전) -> 렌더링된 HTML
+
+# 분석 기간 모드: 최근(2020년 이후, yfinance) / 전체 기간(로컬 가격 저장소)
+HISTORY_MODES = {'recent': '2020년 이후', 'full': '전체 기간'}
+# 성공률/평균 달성일 블록 부트스트랩 재표본 수 (0이면 Wilson 구간만 표시)
+BOOTSTRAP_OPTIONS = {0: '사용 안 함', 1000: '1000회'}
+
+BREADTH_PAGE_ROWS = 50 # 구간 분포 페이지에 표시할 하락률 상위 종목 수
+
 # tickers.json 파일 로드 (애플리케이션 시작 시 한 번만 로드)
-try:
-    with open('tickers.json', 'r', encoding='utf-8') as f:
-        all_stock_data = json.load(f)
-except FileNotFoundError:
-    all_stock_data = []
-    print("Error: tickers.json not found. Autocomplete will not work.")
-except json.JSONDecodeError:
-    all_stock_data = []
-    print("Error: tickers.json is not a valid JSON file. Autocomplete will not work.")
-except Exception as e:
-    all_stock_data = []
-    print(f"An unexpected error occurred while loading tickers.json: {e}")
-
-
-def format_financial_number(value):
-    """재무 수치를 적절한 단위로 포맷팅"""
-    if pd.isna(value) or value is None:
-        return None
-    
-    abs_value = abs(value)
-    if abs_value >= 1_000_000_000:
-        return f"{value / 1_000_000_000:.2f}B"
-    elif abs_value >= 1_000_000:
-        return f"{value / 1_000_000:.2f}M"
-    elif abs_value >= 1_000:
-        return f"{value / 1_000:.2f}K"
-    else:
-        return f"{value:.2f}"
+all_stock_data = load_tickers()
+
+breadth_tracker = BreadthTracker(all_stock_data) # 전체 종목 하락률 구간 (가격 저장소 변경분만 다시 계산)
+breadth_tracker.start_background_refresh() # 첫 /breadth 요청 전에 미리 집계
+
+watch_store = WatchStore()
+alert_engine = AlertEngine(watch_store) # 감시 종목이 /breadth 집계에 섞이지 않도록 전용 트래커 사용
+if os.environ.get('ALERT_SCHEDULER') == '1': # 워커마다 중복 실행되지 않도록 기본은 별도 프로세스(python alerts.py run)로 실행
+    start_scheduler(alert_engine)
+
 
 def calculate_match_score(stock, query):
     """검색 쿼리와 주식 정보의 매칭 점수 계산"""
@@ -66,305 +69,174 @@ def calculate_match_score(stock, query):
     
     return score
 
+def normalize_stock_symbol(raw_symbol):
+    """입력된 종목 심볼 정규화 (공백 제거, 대문자)"""
+    return (raw_symbol or '').strip().upper()
+
+def parse_target_increase_pct(raw_value):
+    """목표 상승률(0~100) 파싱 및 범위 검사"""
+    target_increase_pct = float(raw_value) # 이제 0~100 사이 값
+    if not (0 < target_increase_pct <= 100): # 0% 초과 100% 이하로 변경
+        raise ValueError("목표 상승률은 0% 초과 100% 이하로 입력해주세요.")
+    return target_increase_pct
+
+def parse_bootstrap_resamples(raw_value):
+    """부트스트랩 재표본 수 파싱 (0 ~ MAX_BOOTSTRAP_RESAMPLES)"""
+    bootstrap_resamples = int(raw_value or 0)
+    if not (0 <= bootstrap_resamples <= MAX_BOOTSTRAP_RESAMPLES):
+        raise ValueError(f"부트스트랩 횟수는 0 이상 {MAX_BOOTSTRAP_RESAMPLES} 이하로 입력해주세요.")
+    return bootstrap_resamples
+
+def parse_analysis_options(params):
+    """분석 기간 모드, 해상도, 부트스트랩 재표본 수 파싱 (기본값: 2020년 이후 일봉, 부트스트랩 없음)"""
+    history_mode = (params.get('history') or 'recent').lower()
+    resolution = (params.get('resolution') or 'daily').lower()
+    if history_mode not in HISTORY_MODES:
+        raise ValueError(f"지원하지 않는 분석 기간입니다: {history_mode}")
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"지원하지 않는 해상도입니다: {resolution}")
+    return history_mode, resolution, parse_bootstrap_resamples(params.get('bootstrap'))
+
+def parse_intraday_interval(params, resolution):
+    """장중 모드 봉 간격 파싱 (빈 값이면 사용 안 함, 52주 창이 거래일 기준이므로 일봉 해상도에서만 사용)"""
+    intraday_interval = (params.get('intraday') or '').lower()
+    if not intraday_interval:
+        return None
+    if intraday_interval not in INTRADAY_INTERVALS:
+        raise ValueError(f"지원하지 않는 장중 봉 간격입니다: {intraday_interval}")
+    if resolution != 'daily':
+        raise ValueError("장중 모드는 일봉 해상도에서만 사용할 수 있습니다.")
+    return intraday_interval
+
+def load_analysis_bars(stock_symbol, history_mode, resolution):
+    """분석 기간/해상도에 맞는 봉 데이터 (전체 기간은 로컬 저장소, 주봉/월봉은 캐시된 리샘플링 결과 사용)"""
+    if history_mode == 'full':
+        df = fetch_full_history(stock_symbol)
+    else:
+        df = fetch_price_history(stock_symbol)
+    return get_resampled_bars(stock_symbol, df, resolution)
+
+def response_cache_key(stock_symbol, target_increase_pct, history_mode, resolution, bootstrap_resamples, intraday_interval, df):
+    """응답 캐시 키: (정규화된 심볼, 목표 상승률, 분석 기간, 해상도, 부트스트랩 횟수, 장중 봉 간격, 데이터 버전)
+
+    데이터 버전에 마지막 봉 값이 포함되므로 장중에 마지막 일봉이 바뀌면 새로 렌더링함
+    """
+    return (stock_symbol, f"{target_increase_pct:g}", history_mode, resolution, bootstrap_resamples, intraday_interval,
+            frame_version(df))
+
+def render_index(**context):
+    """기본값을 채워 index.html 렌더링"""
+    values = {
+        'stock_name': None,
+        'stock_symbol': None,
+        'high_52_week': None,
+        'current_price': None,
+        'target_increase_pct': 3, # 기본값은 3% (HTML 폼의 기본값과 일치)
+        'price_levels': [],
+        'operating_income_formatted': None,
+        'net_income_formatted': None,
+        'latest_quarter_date_formatted': None,
+        'error': None,
+        'history_mode': 'recent',
+        'resolution': 'daily',
+        'bootstrap_resamples': 0,
+        'intraday_interval': None,
+        'analysis_period': None,
+        'history_modes': HISTORY_MODES,
+        'resolutions': RESOLUTIONS,
+        'bootstrap_options': BOOTSTRAP_OPTIONS,
+        'intraday_intervals': INTRADAY_INTERVALS,
+    }
+    values.update(context)
+    values['resolution_label'] = RESOLUTIONS[values['resolution']]['label']
+    values['bars_per_year'] = RESOLUTIONS[values['resolution']]['bars_per_year']
+    return render_template('index.html', **values)
+
+def make_index_response(html, cacheable=False):
+    """GET 쿼리 결과는 브라우저/CDN이 캐시하고 공유할 수 있도록 캐시 헤더 추가 (ETag는 렌더링된 내용 기준)"""
+    response = make_response(html)
+    if request.method == 'GET' and cacheable:
+        response.headers['Cache-Control'] = f'public, max-age={PRICE_CACHE_TTL}'
+        response.set_etag(hashlib.sha1(html.encode('utf-8')).hexdigest())
+        response = response.make_conditional(request)
+    return response
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
-    stock_name = None
-    stock_symbol = None
-    high_52_week = None
-    current_price = None
-    target_increase_pct = 3 # 기본값은 3% (HTML 폼의 기본값과 일치)
-    price_levels_to_display = []
-    error = None
-    operating_income_formatted = None
-    net_income_formatted = None
-    latest_quarter_date_formatted = None 
-    low_52_week_close = None # 52주 전저점 (Close 기준)
-    low_this_year_close = None # 올해 최저 종가 (Close 기준)
-
+    # POST 폼과 GET 쿼리(/?stock_symbol=AAPL&target=3)를 동일하게 처리
     if request.method == 'POST':
-        stock_symbol = request.form.get('stock_symbol', '').upper()
-        try:
-            target_increase_pct_raw = request.form.get('target_increase_pct', '3')
-            target_increase_pct = float(target_increase_pct_raw) # 이제 0~100 사이 값
-            if not (0 < target_increase_pct <= 100): # 0% 초과 100% 이하로 변경
-                raise ValueError("목표 상승률은 0% 초과 100% 이하로 입력해주세요.")
-            
-            # 실제 계산에는 비율로 사용
-            target_increase_pct_ratio = target_increase_pct / 100 
+        params = request.form
+    elif request.args.get('stock_symbol'):
+        params = request.args
+    else:
+        return render_index()
 
-        except ValueError as e:
-            error = f"목표 상승률 입력 오류: {e}"
-        except Exception as e:
-            error = f"목표 상승률 처리 중 오류가 발생했습니다: {e}"
-
-        if not error:
-            start_date = '2020-01-01' # 분석 시작 날짜는 넉넉하게 설정
-
-            try:
-                df = yf.download(stock_symbol, start=start_date, progress=False, auto_adjust=False)
-
-                if isinstance(df.columns, pd.MultiIndex):
-                    df.columns = df.columns.droplevel('Ticker')
-
-                df = df[df['Close'].notna()] # 종가 데이터가 있는 행만 사용
-                df = df.sort_index()
-
-                if df.empty:
-                    error = f"'{stock_symbol}' 종목의 데이터를 찾을 수 없거나 데이터가 부족합니다. 심볼을 확인해주세요."
-                
-                if not error:
-                    # 52주 신고점, 52주 전저점 계산
-                    if len(df) >= 252: # 최소 252 거래일 데이터가 있을 경우
-                        high_52_week = df['High'].tail(252).max()
-                        low_52_week_close = df['Close'].tail(252).min()
-                    else: # 252 거래일 데이터가 없으면 전체 기간 중 최고/최저 사용
-                        high_52_week = df['High'].max()
-                        low_52_week_close = df['Close'].min()
-
-                    # 올해 최저 종가 계산
-                    current_year = datetime.now().year
-                    df_current_year = df.loc[df.index.year == current_year]
-                    if not df_current_year.empty:
-                        low_this_year_close = df_current_year['Close'].min()
-                    else: # 올해 데이터가 없으면 전체 데이터 중 최저 사용 (대체)
-                        low_this_year_close = df['Close'].min()
-
-
-                    current_price = df['Close'].iloc[-1]
-
-                    ticker = yf.Ticker(stock_symbol)
-                    stock_info = ticker.info
-                    stock_name = stock_info.get('longName', stock_symbol)
-
-                    # 재무 데이터 가져오기
-                    try:
-                        financials = ticker.quarterly_financials 
-                        if not financials.empty and 'Operating Income' in financials.index and 'Net Income' in financials.index:
-                            latest_quarter_date = financials.columns[0] # 가장 최근 분기
-                            latest_quarter_date_formatted = latest_quarter_date.strftime('%Y-%m-%d')
-                            
-                            operating_income = financials.loc['Operating Income', latest_quarter_date]
-                            operating_income_formatted = format_financial_number(operating_income)
-                            
-                            net_income = financials.loc['Net Income', latest_quarter_date]
-                            net_income_formatted = format_financial_number(net_income)
-                                
-                    except Exception as e:
-                        print(f"재무 데이터 가져오기 실패 또는 데이터 없음: {e}")
-                        operating_income_formatted = None
-                        net_income_formatted = None
-                        latest_quarter_date_formatted = None
-
-            except Exception as e:
-                print(f"Error fetching data for {stock_symbol}: {e}")
-                error = f"데이터를 가져오는 중 오류가 발생했습니다: {e}. 정확한 종목 심볼을 입력했는지 확인해주세요."
-
-        if not error and high_52_week and current_price: # 데이터가 성공적으로 로드된 경우에만 분석 진행
-            actual_percent_drop = (1 - current_price / high_52_week) * 100 if high_52_week else 0
-
-            # 52주 전저점 하락률 계산
-            max_drop_52_week_val = (1 - low_52_week_close / high_52_week) * 100 if high_52_week and low_52_week_close else 0
-            max_drop_52_week_price = low_52_week_close
-
-            # 올해 최저 하락률 계산 (52주 신고점 대비)
-            max_drop_this_year_val = (1 - low_this_year_close / high_52_week) * 100 if high_52_week and low_this_year_close else 0
-            max_drop_this_year_price = low_this_year_close
-
-
-            # 성공률 분석 로직
-            df_for_analysis = df.copy()
-            # 52주 신고점 계산 (롤링 윈도우)
-            df_for_analysis['52W_High_Analysis'] = df_for_analysis['High'].rolling(window=252, min_periods=1).max()
-            # 52주 신고점 대비 하락률 계산
-            df_for_analysis['Drawdown_Analysis'] = (df_for_analysis['Close'] - df_for_analysis['52W_High_Analysis']) / df_for_analysis['52W_High_Analysis']
-            df_for_analysis['Prev_Drawdown_Analysis'] = df_for_analysis['Drawdown_Analysis'].shift(1)
-
-            success_analysis_data = {} 
-
-            # 5% 단위로 하락률 구간 설정 (0%는 제외하고 5%부터 시작)
-            for drawdown_pct_val in range(5, 95, 5): 
-                drawdown_threshold = -drawdown_pct_val / 100
-
-                # 특정 하락률에 처음 도달하는 시점 (매수 시점)
-                buy_points = df_for_analysis[
-                    (df_for_analysis['Drawdown_Analysis'] <= drawdown_threshold) &
-                    (df_for_analysis['Prev_Drawdown_Analysis'] > drawdown_threshold)
-                ]
-                
-                success_cases = 0
-                total_cases = len(buy_points)
-                success_days = []
-                
-                if not buy_points.empty:
-                    for buy_date in buy_points.index:
-                        try:
-                            buy_price = df_for_analysis.loc[buy_date, 'Close']
-                            target_price_for_success = buy_price * (1 + target_increase_pct_ratio) # 실제 비율 사용
-                            
-                            idx = df_for_analysis.index.get_loc(buy_date)
-                            # 현재 매수 시점 이후 252 거래일 (약 1년) 데이터만 고려
-                            if idx >= len(df_for_analysis) - 1:
-                                continue # 마지막 데이터는 분석 불가
-
-                            future_data = df_for_analysis.iloc[idx + 1:min(idx + 252 + 1, len(df_for_analysis))] # 252거래일 + 현재일 포함
-                            
-                            if future_data.empty:
-                                continue
-
-                            # 목표 가격 달성 여부 확인 (고가 기준)
-                            target_hit = future_data[future_data['High'] >= target_price_for_success]
-                            
-                            if not target_hit.empty:
-                                success_cases += 1
-                                achieve_date = target_hit.index[0]
-                                # 달성까지 걸린 거래일 수
-                                days_to_achieve = len(df_for_analysis.loc[buy_date:achieve_date]) - 1 
-                                success_days.append(days_to_achieve)
-                            
-                        except Exception as e:
-                            # print(f"분석 중 오류 발생 ({buy_date}): {e}") # 디버깅용
-                            continue
-                
-                failure_cases = total_cases - success_cases
-                success_rate = (success_cases / total_cases * 100) if total_cases > 0 else 0
-                avg_days = sum(success_days) / len(success_days) if success_days else None
-                
-                success_analysis_data[drawdown_pct_val] = {
-                    'successRate': round(success_rate, 1),
-                    'successCases': success_cases,
-                    'failureCases': failure_cases,
-                    'totalCases': total_cases,
-                    'avgDays': round(avg_days, 1) if avg_days else None
-                }
-
-            # 표시할 가격 레벨 데이터 구성
-            price_levels_to_display = []
-
-            # 0% 하락률 (신고점) 데이터 추가
-            price_levels_to_display.append({
-                "percent_drop": 0,
-                "target_price": high_52_week,
-                "is_current": False,
-                "is_max_drop_1_year": False,
-                "is_max_drop_this_year": False,
-                **success_analysis_data.get(0, {'successRate': None, 'successCases': None, 'failureCases': None, 'totalCases': None, 'avgDays': None})
-            })
+    stock_symbol = normalize_stock_symbol(params.get('stock_symbol'))
+    target_increase_pct = 3
+    history_mode, resolution, bootstrap_resamples, intraday_interval = 'recent', 'daily', 0, None
+    error = None
 
-            # 표준 하락률 레벨 추가 (5% 단위)
-            for percent_drop_val in range(5, 81, 5):
-                target_price_level = high_52_week * (1 - percent_drop_val / 100)
-                price_levels_to_display.append({
-                    "percent_drop": float(percent_drop_val), # 소수점 처리
-                    "target_price": round(target_price_level, 2),
-                    "is_current": False,
-                    "is_max_drop_1_year": False,
-                    "is_max_drop_this_year": False,
-                    **success_analysis_data.get(percent_drop_val, {'successRate': None, 'successCases': None, 'failureCases': None, 'totalCases': None, 'avgDays': None})
-                })
-            
-            # 현재가 데이터
-            current_price_data = {
-                "percent_drop": actual_percent_drop,
-                "target_price": current_price,
-                "is_current": True,
-                "is_max_drop_1_year": False,
-                "is_max_drop_this_year": False,
-                'successRate': None, 'successCases': None, 'failureCases': None, 'totalCases': None, 'avgDays': None
-            }
-
-            # 52주 전저점 데이터
-            max_drop_52_week_data = {
-                "percent_drop": max_drop_52_week_val,
-                "target_price": max_drop_52_week_price,
-                "is_current": False,
-                "is_max_drop_1_year": True,
-                "is_max_drop_this_year": False,
-                'successRate': None, 'successCases': None, 'failureCases': None, 'totalCases': None, 'avgDays': None
-            }
-
-            # 올해 최저 하락 데이터
-            max_drop_this_year_data = { 
-                "percent_drop": max_drop_this_year_val,
-                "target_price": max_drop_this_year_price,
-                "is_current": False,
-                "is_max_drop_1_year": False,
-                "is_max_drop_this_year": True, 
-                'successRate': None, 'successCases': None, 'failureCases': None, 'totalCases': None, 'avgDays': None
-            }
-
-            # 특별한 가격 레벨들을 삽입 (중복 방지 및 순서 유지)
-            # 현재가가 0% 하락률보다 크거나 같고, 첫 번째 표준 하락률보다 작을 경우 0%와 5% 사이에 삽입
-            if 0 <= actual_percent_drop < 5:
-                # 0% 하락률 바로 다음에 현재가 삽입
-                price_levels_to_display.insert(1, current_price_data) 
-            else:
-                # 적절한 위치에 삽입 (이미 존재하는 하락률과 겹치지 않게)
-                inserted = False
-                for i in range(1, len(price_levels_to_display)):
-                    if price_levels_to_display[i-1]["percent_drop"] < actual_percent_drop <= price_levels_to_display[i]["percent_drop"]:
-                        price_levels_to_display.insert(i, current_price_data)
-                        inserted = True
-                        break
-                if not inserted: # 모든 표준 레벨보다 클 경우 마지막에 추가
-                    price_levels_to_display.append(current_price_data)
-
-            # 52주 전저점 데이터 삽입 (현재가와 겹치지 않게)
-            inserted = False
-            for i in range(len(price_levels_to_display)):
-                if price_levels_to_display[i]["percent_drop"] == max_drop_52_week_data["percent_drop"] and price_levels_to_display[i].get("is_max_drop_1_year") == True:
-                    inserted = True # 이미 같은 52주 전저점 데이터가 있음 (겹치는 5% 간격에 포함되어)
-                    break
-                if price_levels_to_display[i]["percent_drop"] < max_drop_52_week_data["percent_drop"]:
-                    if i + 1 < len(price_levels_to_display) and price_levels_to_display[i+1]["percent_drop"] > max_drop_52_week_data["percent_drop"]:
-                        price_levels_to_display.insert(i+1, max_drop_52_week_data)
-                        inserted = True
-                        break
-                elif i == 0 and max_drop_52_week_data["percent_drop"] < price_levels_to_display[0]["percent_drop"]: # 0%보다 작은 경우 (이런 경우는 거의 없겠지만)
-                    price_levels_to_display.insert(0, max_drop_52_week_data)
-                    inserted = True
-                    break
-            if not inserted: # 아직 삽입되지 않았다면 맨 뒤에 추가
-                price_levels_to_display.append(max_drop_52_week_data)
-
-            # 올해 최저 하락률 데이터 삽입 (다른 특별 행들과 겹치지 않게)
-            inserted = False
-            for i in range(len(price_levels_to_display)):
-                if price_levels_to_display[i]["percent_drop"] == max_drop_this_year_data["percent_drop"] and price_levels_to_display[i].get("is_max_drop_this_year") == True:
-                    inserted = True # 이미 같은 올해 최저 하락률 데이터가 있음
-                    break
-                if price_levels_to_display[i]["percent_drop"] < max_drop_this_year_data["percent_drop"]:
-                    if i + 1 < len(price_levels_to_display) and price_levels_to_display[i+1]["percent_drop"] > max_drop_this_year_data["percent_drop"]:
-                        price_levels_to_display.insert(i+1, max_drop_this_year_data)
-                        inserted = True
-                        break
-                elif i == 0 and max_drop_this_year_data["percent_drop"] < price_levels_to_display[0]["percent_drop"]:
-                    price_levels_to_display.insert(0, max_drop_this_year_data)
-                    inserted = True
-                    break
-            if not inserted: # 아직 삽입되지 않았다면 맨 뒤에 추가
-                price_levels_to_display.append(max_drop_this_year_data)
-
-
-            # 최종적으로 하락률 기준으로 정렬
-            price_levels_to_display.sort(key=lambda x: x['percent_drop'])
-            
-            # 음수 하락률 (즉, 신고점보다 높은 가격)은 0으로 표시
-            for item in price_levels_to_display:
-                if item['percent_drop'] < 0:
-                    item['percent_drop'] = 0.00
-            
+    try:
+        target_increase_pct_raw = params.get('target_increase_pct') or params.get('target') or '3'
+        target_increase_pct = parse_target_increase_pct(target_increase_pct_raw)
+    except ValueError as e:
+        error = f"목표 상승률 입력 오류: {e}"
+    except Exception as e:
+        error = f"목표 상승률 처리 중 오류가 발생했습니다: {e}"
 
-    return render_template('index.html',
-                           stock_name=stock_name,
-                           stock_symbol=stock_symbol,
-                           high_52_week=high_52_week,
-                           current_price=current_price,
-                           target_increase_pct=target_increase_pct, # 다시 0~100 값으로 전달
-                           price_levels=price_levels_to_display,
-                           operating_income_formatted=operating_income_formatted,
-                           net_income_formatted=net_income_formatted,
-                           latest_quarter_date_formatted=latest_quarter_date_formatted, 
-                           error=error)
+    if not error:
+        try:
+            history_mode, resolution, bootstrap_resamples = parse_analysis_options(params)
+            intraday_interval = parse_intraday_interval(params, resolution)
+        except ValueError as e:
+            error = f"분석 옵션 입력 오류: {e}"
+
+    options = {'stock_symbol': stock_symbol, 'target_increase_pct': target_increase_pct,
+               'history_mode': history_mode, 'resolution': resolution, 'bootstrap_resamples': bootstrap_resamples,
+               'intraday_interval': intraday_interval}
+    if error:
+        return render_index(error=error, **options)
+
+    try:
+        df = load_analysis_bars(stock_symbol, history_mode, resolution)
+
+        if df.empty:
+            error = f"'{stock_symbol}' 종목의 데이터를 찾을 수 없거나 데이터가 부족합니다. 심볼을 확인해주세요."
+            return render_index(error=error, **options)
+
+        # 같은 데이터 버전(마지막 봉 날짜)에 대해 렌더링된 결과가 있으면 그대로 반환
+        cache_key = response_cache_key(stock_symbol, target_increase_pct, history_mode, resolution, bootstrap_resamples,
+                                       intraday_interval, df)
+        html = response_cache.get(cache_key)
+        if html is not None:
+            return make_index_response(html, cacheable=True)
+
+        profile = fetch_stock_profile(stock_symbol)
+
+    except Exception as e:
+        print(f"Error fetching data for {stock_symbol}: {e}")
+        error = f"데이터를 가져오는 중 오류가 발생했습니다: {e}. 정확한 종목 심볼을 입력했는지 확인해주세요."
+        return render_index(error=error, **options)
+
+    bars_per_year = RESOLUTIONS[resolution]['bars_per_year']
+    stats, price_levels_to_display = cached_analyze_stock(stock_symbol, df, target_increase_pct / 100, # 실제 계산에는 비율로 사용
+                                                          bars_per_year, bootstrap_resamples)
+
+    analysis_period = None
+    if history_mode != 'recent' or resolution != 'daily':
+        analysis_period = f"{df.index[0]:%Y-%m-%d} ~ {df.index[-1]:%Y-%m-%d} ({RESOLUTIONS[resolution]['name']})"
+
+    html = render_index(stock_name=profile['stock_name'],
+                        high_52_week=stats['high_52_week'],
+                        current_price=stats['current_price'],
+                        price_levels=price_levels_to_display,
+                        operating_income_formatted=profile['operating_income_formatted'],
+                        net_income_formatted=profile['net_income_formatted'],
+                        latest_quarter_date_formatted=profile['latest_quarter_date_formatted'],
+                        analysis_period=analysis_period,
+                        **options) # target_increase_pct는 다시 0~100 값으로 전달
+    response_cache.set(cache_key, html)
+    return make_index_response(html, cacheable=True)
 
 @app.route('/search_stock', methods=['GET'])
 def search_stock():
@@ -405,5 +277,161 @@ def search_stock():
     
     return jsonify(suggestions)
 
+@app.route('/api/live/<stock_symbol>', methods=['GET'])
+def live_quote(stock_symbol):
+    """장중 봉 기준 실시간 52주 신고점/하락률/구간 (일봉 분석은 다시 계산하지 않음)"""
+    stock_symbol = normalize_stock_symbol(stock_symbol)
+    interval = (request.args.get('interval') or '1m').lower()
+    if interval not in INTRADAY_INTERVALS:
+        return jsonify({'error': f'지원하지 않는 장중 봉 간격입니다: {interval}'}), 400
+    try:
+        snapshot = get_live_snapshot(stock_symbol, interval)
+    except Exception as e:
+        print(f"Error fetching intraday data for {stock_symbol}: {e}")
+        return jsonify({'error': f'장중 데이터를 가져오는 중 오류가 발생했습니다: {e}'}), 502
+    if snapshot is None:
+        return jsonify({'error': f"'{stock_symbol}' 종목의 장중 데이터가 없습니다."}), 404
+    response = jsonify(snapshot)
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@app.route('/breadth', methods=['GET'])
+def breadth():
+    """전체 종목의 52주 신고점 대비 하락률 구간 분포 페이지"""
+    breadth_tracker.refresh_if_stale()
+    summary = breadth_tracker.summary()
+    max_band_count = max((row['count'] for row in summary['band_histogram']), default=0)
+    return render_template('breadth.html',
+                           summary=summary,
+                           max_band_count=max_band_count,
+                           deepest=summary['symbols'][:BREADTH_PAGE_ROWS])
+
+@app.route('/api/breadth', methods=['GET'])
+def breadth_api():
+    """하락률 구간 분포 API (symbols=1이면 종목별 값 포함)"""
+    breadth_tracker.refresh_if_stale()
+    summary = breadth_tracker.summary()
+    if request.args.get('symbols') != '1':
+        summary = {key: value for key, value in summary.items() if key != 'symbols'}
+    return jsonify(summary)
+
+@app.route('/api/alerts', methods=['GET'])
+def list_alerts():
+    """감시 목록 조회 (symbol 지정 시 해당 종목만, 알림 대상 설정은 제외)"""
+    return jsonify([public_watch(watch) for watch in watch_store.list_watches(request.args.get('symbol'))])
+
+@app.route('/api/alerts', methods=['POST'])
+def create_alert():
+    """감시 조건 등록 (symbol, band, min_success_rate, target, sink, sink_target)"""
+    data = request.get_json(silent=True) or request.form
+    try:
+        watch = watch_store.add_watch(data.get('symbol'),
+                                      data.get('band'),
+                                      data.get('min_success_rate') or 0,
+                                      data.get('target') or data.get('target_increase_pct') or 3,
+                                      data.get('sink') or 'log',
+                                      data.get('sink_target'))
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'입력 오류: {e}'}), 400
+    return jsonify(public_watch(watch)), 201
+
+@app.route('/api/alerts/<watch_id>', methods=['DELETE'])
+def delete_alert(watch_id):
+    if not watch_store.remove_watch(watch_id):
+        return jsonify({'error': '감시 조건을 찾을 수 없습니다.'}), 404
+    return '', 204
+
+def parse_peer_request(params):
+    """피어 그룹 요청 파싱 (symbols와 top을 함께 주면 합집합). (심볼 목록, 목표 상승률, 분석 기간) 반환"""
+    symbols = parse_symbol_list(params.get('symbols') or '')
+    top = int(params.get('top') or 0)
+    target_increase_pct = parse_target_increase_pct(params.get('target_increase_pct') or params.get('target') or '3')
+    history_mode = str(params.get('history') or 'recent').lower()
+    if history_mode not in HISTORY_MODES:
+        raise ValueError(f"지원하지 않는 분석 기간입니다: {history_mode}")
+    if top > 0:
+        symbols = parse_symbol_list(symbols + top_ranked_symbols(top, all_stock_data))
+    if len(symbols) > MAX_PEER_SYMBOLS:
+        raise ValueError(f"피어 그룹은 최대 {MAX_PEER_SYMBOLS}개 종목까지 지정할 수 있습니다.")
+    return symbols, target_increase_pct, history_mode
+
+@app.route('/peers', methods=['GET', 'POST'])
+def peers():
+    """피어 그룹 하락률 구간 성공률 페이지 (예: /peers?top=500&target=3)"""
+    params = request.values
+    context = {
+        'symbols_text': params.get('symbols') or '',
+        'top': params.get('top') or '',
+        'target_increase_pct': 3.0,
+        'history_mode': 'recent',
+        'history_modes': HISTORY_MODES,
+        'max_peer_symbols': MAX_PEER_SYMBOLS,
+        'result': None,
+        'error': None,
+    }
+    if not (params.get('symbols') or params.get('top')):
+        return render_template('peers.html', **context)
+
+    try:
+        symbols, target_increase_pct, history_mode = parse_peer_request(params)
+    except (TypeError, ValueError) as e:
+        context['error'] = f"입력 오류: {e}"
+        return render_template('peers.html', **context)
+    context.update(target_increase_pct=target_increase_pct, history_mode=history_mode)
+    if not symbols:
+        context['error'] = "분석할 종목을 하나 이상 지정해주세요."
+        return render_template('peers.html', **context)
+
+    context['result'] = pooled_analysis(symbols, target_increase_pct, history_mode)
+    if not context['result']['included']:
+        context['error'] = "가격 저장소에 저장된 종목이 없습니다. python breadth.py --update로 먼저 데이터를 받아주세요."
+        context['result'] = None
+    return render_template('peers.html', **context)
+
+@app.route('/api/peers', methods=['GET', 'POST'])
+def peers_api():
+    """피어 그룹 하락률 구간 성공률 API (symbols, top, target, history)"""
+    body = request.get_json(silent=True) if request.is_json else None
+    params = body if isinstance(body, dict) else request.values
+    try:
+        symbols, target_increase_pct, history_mode = parse_peer_request(params)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'입력 오류: {e}'}), 400
+    if not symbols:
+        return jsonify({'error': '분석할 종목을 하나 이상 지정해주세요.'}), 400
+    return jsonify(pooled_analysis(symbols, target_increase_pct, history_mode))
+
+@app.route('/export', methods=['GET', 'POST'])
+def export_results():
+    """여러 종목의 분석 결과를 CSV/Parquet으로 스트리밍 (예: /export?symbols=AAPL,MSFT&target=3&format=csv)"""
+    body = request.get_json(silent=True) if request.is_json else None
+    params = body if isinstance(body, dict) else request.values
+
+    symbols = parse_symbol_list(params.get('symbols') or '')
+    try:
+        top = int(params.get('top') or 0)
+        target_increase_pct = parse_target_increase_pct(params.get('target_increase_pct') or params.get('target') or '3')
+        bootstrap_resamples = parse_bootstrap_resamples(params.get('bootstrap'))
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'입력 오류: {e}'}), 400
+    if top > 0:
+        symbols = parse_symbol_list(symbols + top_ranked_symbols(top, all_stock_data))
+
+    export_format = str(params.get('format') or 'csv').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"지원하지 않는 형식입니다: {export_format} (csv, parquet 중 선택)"}), 400
+    if export_format == 'parquet' and not parquet_available():
+        return jsonify({'error': 'Parquet 내보내기에는 pyarrow가 필요합니다.'}), 400
+    if not symbols:
+        return jsonify({'error': '내보낼 종목을 하나 이상 지정해주세요.'}), 400
+    if len(symbols) > MAX_EXPORT_SYMBOLS:
+        return jsonify({'error': f'한 번에 최대 {MAX_EXPORT_SYMBOLS}개 종목까지 내보낼 수 있습니다.'}), 400
+
+    mimetype = 'application/vnd.apache.parquet' if export_format == 'parquet' else 'text/csv'
+    return Response(stream_with_context(iter_export(export_format, symbols, target_increase_pct,
+                                                    bootstrap_resamples=bootstrap_resamples)),
+                    mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename=analysis_export.{export_format}'})
+
 if __name__ == '__main__':
     app.run(debug=True, port=7000)
\ No newline at end of file
@@ -0,0 +1,230 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from analysis import DRAWDOWN_BANDS, TRADING_DAYS_PER_YEAR
+from market_data import load_tickers
+from price_store import load_bars, store_mtime, update_bars
+
+BREADTH_BANDS = [0] + list(DRAWDOWN_BANDS) # 0%(신고점 근처) ~ 90% 구간, 5% 단위
+BREADTH_REFRESH_INTERVAL = int(os.environ.get('BREADTH_REFRESH_INTERVAL', '30')) # 저장소 변경 확인 최소 간격 (초)
+BREADTH_UPDATE_WORKERS = int(os.environ.get('BREADTH_UPDATE_WORKERS', '8'))
+
+# 시가총액 순위 구간 (끝이 None이면 그 이후 전체)
+RANK_BUCKETS = [(1, 10), (11, 50), (51, 100), (101, 250), (251, 500), (501, 1000), (1001, None)]
+
+
+def drawdown_band(drawdown_pct):
+    """하락률(%)이 속한 5% 구간의 시작값 (예: 23.4% -> 20)"""
+    band = int(drawdown_pct // 5) * 5
+    return min(max(band, BREADTH_BANDS[0]), BREADTH_BANDS[-1])
+
+
+def rank_bucket_label(rank):
+    if not isinstance(rank, (int, float)):
+        return None
+    for start, end in RANK_BUCKETS:
+        if rank >= start and (end is None or rank <= end):
+            return f"{start}-{end}" if end is not None else f"{start}+"
+    return None
+
+
+def compute_snapshot(df, bars_per_year=TRADING_DAYS_PER_YEAR):
+    """마지막 봉 기준 52주 신고점 대비 하락률/구간과 전일 대비 구간 이동 계산 (최근 bars_per_year + 1 봉만 사용)"""
+    if df.empty:
+        return None
+
+    tail = df.tail(bars_per_year + 1)
+    rolling_high = tail['High'].rolling(window=bars_per_year, min_periods=1).max().to_numpy(dtype=float)
+    close = tail['Close'].to_numpy(dtype=float)
+    drawdown_pct = np.maximum((1 - close / rolling_high) * 100, 0)
+
+    band = drawdown_band(drawdown_pct[-1])
+    prev_band = drawdown_band(drawdown_pct[-2]) if len(tail) > 1 else None
+    crossed = None
+    if prev_band is not None and band != prev_band:
+        crossed = 'down' if band > prev_band else 'up' # down: 더 깊은 구간으로 하락
+
+    return {
+        'as_of': tail.index[-1].strftime('%Y-%m-%d'),
+        'close': float(close[-1]),
+        'high_52_week': float(rolling_high[-1]),
+        'drawdown_pct': round(float(drawdown_pct[-1]), 2),
+        'prev_drawdown_pct': round(float(drawdown_pct[-2]), 2) if len(tail) > 1 else None,
+        'band': band,
+        'prev_band': prev_band,
+        'crossed': crossed,
+    }
+
+
+def build_summary(snapshots, universe_size):
+    """구간별/순위 구간별 분포와 오늘 구간을 넘나든 종목 목록 집계"""
+    as_of = max((snapshot['as_of'] for snapshot in snapshots), default=None)
+
+    band_counts = dict.fromkeys(BREADTH_BANDS, 0)
+    buckets = {}
+    for start, end in RANK_BUCKETS:
+        label = f"{start}-{end}" if end is not None else f"{start}+"
+        buckets[label] = {'label': label, 'count': 0, 'bands': dict.fromkeys(BREADTH_BANDS, 0), 'drawdowns': []}
+
+    for snapshot in snapshots:
+        band_counts[snapshot['band']] += 1
+        bucket = buckets.get(snapshot['rank_bucket'])
+        if bucket is not None:
+            bucket['count'] += 1
+            bucket['bands'][snapshot['band']] += 1
+            bucket['drawdowns'].append(snapshot['drawdown_pct'])
+
+    rank_buckets = []
+    for bucket in buckets.values():
+        drawdowns = bucket.pop('drawdowns')
+        bucket['median_drawdown_pct'] = round(float(np.median(drawdowns)), 2) if drawdowns else None
+        bucket['bands'] = [{'band': band, 'count': count} for band, count in bucket['bands'].items()]
+        rank_buckets.append(bucket)
+
+    # 마지막 봉이 전체 기준일과 같은 종목 중 구간이 바뀐 종목 (깊은 구간부터)
+    crossed_today = sorted(
+        (snapshot for snapshot in snapshots if snapshot['crossed'] and snapshot['as_of'] == as_of),
+        key=lambda snapshot: (-snapshot['band'], snapshot['rank'] if snapshot['rank'] is not None else float('inf')),
+    )
+
+    return {
+        'as_of': as_of,
+        'universe_size': universe_size,
+        'tracked': len(snapshots),
+        'band_histogram': [{'band': band, 'label': f"{band}~{band + 5}%", 'count': count}
+                           for band, count in band_counts.items()],
+        'rank_buckets': rank_buckets,
+        'crossed_today': crossed_today,
+        'symbols': sorted(snapshots, key=lambda snapshot: -snapshot['drawdown_pct']), # 하락률 깊은 순
+    }
+
+
+class BreadthTracker:
+    """tickers.json 전체 종목의 현재 하락률 구간을 가격 저장소 변경분만 다시 계산하며 유지"""
+
+    def __init__(self, tickers, bars_per_year=TRADING_DAYS_PER_YEAR, refresh_interval=BREADTH_REFRESH_INTERVAL):
+        self.tickers = {stock['symbol'].upper(): stock for stock in tickers if stock.get('symbol')}
+        self.bars_per_year = bars_per_year
+        self.refresh_interval = refresh_interval
+        self._snapshots = {} # 심볼 -> 스냅샷
+        self._mtimes = {} # 심볼 -> 스냅샷 계산에 사용한 저장소 데이터 버전 (파일 수정 시각)
+        self._summary = None # 스냅샷이 바뀌었을 때만 다시 집계
+        self._last_refresh = None
+        self._lock = threading.Lock() # 스냅샷/집계 결과 보호 (짧게만 잡음)
+        self._refresh_lock = threading.Lock() # 저장소 확인은 한 번에 한 스레드만
+
+    def track(self, symbol, name=None):
+        """tickers.json에 없는 종목(예: 알림 감시 종목)도 집계 대상에 추가"""
+        symbol = symbol.upper()
+        with self._lock:
+            if symbol not in self.tickers:
+                self.tickers[symbol] = {'symbol': symbol, 'name': name or symbol}
+
+    def refresh(self):
+        """저장소 데이터 버전(파일 수정 시각)이 바뀐 종목만 스냅샷을 다시 계산. 다시 계산한 종목 목록 반환
+
+        파일을 읽는 동안에는 집계 결과 잠금을 잡지 않으므로 summary()/snapshot()은 이전 결과로 바로 응답함
+        """
+        with self._refresh_lock:
+            with self._lock:
+                tickers = list(self.tickers.items())
+
+            updates = {} # 심볼 -> (데이터 버전, 스냅샷 또는 None)
+            for symbol, stock in tickers:
+                mtime = store_mtime(symbol)
+                if mtime == self._mtimes.get(symbol):
+                    continue
+
+                snapshot = None
+                if mtime is not None:
+                    try:
+                        snapshot = compute_snapshot(load_bars(symbol, use_cache=False), self.bars_per_year)
+                    except Exception as e:
+                        print(f"하락률 구간 계산 실패 ({symbol}): {e}")
+                if snapshot is not None:
+                    rank = stock.get('rank')
+                    snapshot = {
+                        'symbol': symbol,
+                        'name': stock.get('name', symbol),
+                        'rank': rank if isinstance(rank, (int, float)) else None,
+                        'rank_bucket': rank_bucket_label(rank),
+                        **snapshot,
+                    }
+                updates[symbol] = (mtime, snapshot)
+
+            with self._lock:
+                for symbol, (mtime, snapshot) in updates.items():
+                    self._mtimes[symbol] = mtime
+                    if snapshot is None:
+                        self._snapshots.pop(symbol, None)
+                    else:
+                        self._snapshots[symbol] = snapshot
+                if updates:
+                    self._summary = None
+                self._last_refresh = time.monotonic()
+        return list(updates)
+
+    def refresh_if_stale(self):
+        """마지막 확인 후 refresh_interval초가 지났을 때만 저장소 변경 확인 (다른 스레드가 확인 중이면 기다리지 않음)"""
+        if self._last_refresh is not None and time.monotonic() - self._last_refresh < self.refresh_interval:
+            return []
+        if self._refresh_lock.locked():
+            return []
+        return self.refresh()
+
+    def start_background_refresh(self):
+        """첫 요청이 전체 종목을 읽느라 기다리지 않도록 백그라운드 스레드에서 첫 집계 실행"""
+        thread = threading.Thread(target=self.refresh, name='breadth-warmup', daemon=True)
+        thread.start()
+        return thread
+
+    def snapshot(self, symbol):
+        with self._lock:
+            return self._snapshots.get(symbol.upper())
+
+    def summary(self):
+        with self._lock:
+            if self._summary is None:
+                self._summary = build_summary(list(self._snapshots.values()), len(self.tickers))
+            return self._summary
+
+
+def update_universe(symbols, workers=BREADTH_UPDATE_WORKERS):
+    """여러 종목의 새 봉을 가격 저장소에 추가. 새 봉이 생긴 종목 목록 반환"""
+    def update(symbol):
+        try:
+            return symbol, update_bars(symbol)
+        except Exception as e:
+            print(f"가격 저장소 갱신 실패 ({symbol}): {e}")
+            return symbol, 0
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        return [symbol for symbol, new_bar_count in executor.map(update, symbols) if new_bar_count]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="tickers.json 전체 종목의 52주 신고점 대비 하락률 구간 분포")
+    parser.add_argument('--update', action='store_true', help="집계 전에 가격 저장소에 새 봉 추가")
+    parser.add_argument('--workers', type=int, default=BREADTH_UPDATE_WORKERS)
+    args = parser.parse_args(argv)
+
+    tracker = BreadthTracker(load_tickers())
+    if args.update:
+        updated = update_universe(list(tracker.tickers), workers=args.workers)
+        print(f"새 봉이 추가된 종목: {len(updated)}개", file=sys.stderr)
+    tracker.refresh()
+    summary = tracker.summary()
+    json.dump({key: value for key, value in summary.items() if key != 'symbols'}, sys.stdout, ensure_ascii=False, indent=2)
+    print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
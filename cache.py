@@ -0,0 +1,144 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+def estimate_size(value):
+    """캐시 항목의 대략적인 바이트 크기 계산"""
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if hasattr(value, 'memory_usage'):  # pandas DataFrame/Series
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if hasattr(usage, 'sum') else int(usage)
+    if hasattr(value, 'nbytes'):  # numpy 배열
+        return int(value.nbytes)
+    return sys.getsizeof(value)
+
+
+def frame_version(df):
+    """DataFrame 데이터 버전 (기간, 행 수, 마지막 행 값). 장중에 마지막 봉 값만 바뀌어도 달라지므로 캐시 키에 사용"""
+    if len(df) == 0:
+        return (0,)
+    # NaN은 자기 자신과 같지 않아 키가 매번 달라지므로 None으로 바꿈
+    last_row = tuple(None if value != value else value for value in df.iloc[-1].tolist())
+    return (df.index[0], df.index[-1], len(df), last_row)
+
+
+class ByteLRUCache:
+    """전체 바이트 크기 기준으로 용량을 제한하는 스레드 안전 LRU 캐시 (max_age를 지정하면 그 시간(초)이 지난 항목은 만료)"""
+
+    def __init__(self, max_bytes, sizeof=estimate_size, max_age=None):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.max_age = max_age
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()  # key -> (value, size, stored_at)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and self.max_age is not None and time.monotonic() - item[2] > self.max_age:
+                del self._items[key]
+                self.total_bytes -= item[1]
+                item = None
+            if item is None:
+                self.misses += 1
+                return default
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key, value):
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return False  # 캐시 전체보다 큰 항목은 저장하지 않음
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+            self._items[key] = (value, size, time.monotonic())
+            self.total_bytes += size
+            # 용량을 넘으면 가장 오래 사용되지 않은 항목부터 제거
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._items.popitem(last=False)
+                self.total_bytes -= evicted_size
+        return True
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._items.pop(key, None)
+            if item is None:
+                return default
+            self.total_bytes -= item[1]
+            return item[0]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._items),
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+
+class TTLCache:
+    """일정 시간(초)이 지나면 만료되는 스레드 안전 캐시"""
+
+    def __init__(self, ttl_seconds, max_entries=None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._items = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return default
+            stored_at, value = item
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._items[key]
+                return default
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = (time.monotonic(), value)
+            if self.max_entries is not None:
+                while len(self._items) > self.max_entries:
+                    self._items.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._items.pop(key, None)
+            return default if item is None else item[1]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
@@ -0,0 +1,315 @@
+import argparse
+import csv
+import io
+import math
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from analysis import BOOTSTRAP_STATS_KEYS, MAX_BOOTSTRAP_RESAMPLES, cached_analyze_stock
+from market_data import fetch_price_history, fetch_stock_profile, load_tickers
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError: # Parquet 내보내기는 pyarrow가 설치된 경우에만 지원
+    pa = None
+    pq = None
+
+EXPORT_FORMATS = ('csv', 'parquet')
+EXPORT_WORKERS = int(os.environ.get('EXPORT_WORKERS', '8')) # 종목 데이터를 동시에 가져올 스레드 수
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '32')) # 한 번에 처리/전송할 종목 수 (메모리 사용량 상한)
+MAX_EXPORT_SYMBOLS = int(os.environ.get('MAX_EXPORT_SYMBOLS', '5000'))
+
+# 내보내기 컬럼 (종목 단위 값 + 가격 레벨 단위 값)
+EXPORT_COLUMNS = [
+    ('symbol', 'string'),
+    ('name', 'string'),
+    ('data_as_of', 'string'),
+    ('target_increase_pct', 'float'),
+    ('high_52_week', 'float'),
+    ('current_price', 'float'),
+    ('low_52_week_close', 'float'),
+    ('low_this_year_close', 'float'),
+    ('current_drop_pct', 'float'),
+    ('operating_income', 'float'),
+    ('net_income', 'float'),
+    ('latest_quarter_date', 'string'),
+    ('level_type', 'string'),
+    ('percent_drop', 'float'),
+    ('target_price', 'float'),
+    ('successRate', 'float'),
+    ('successCases', 'int'),
+    ('failureCases', 'int'),
+    ('totalCases', 'int'),
+    ('avgDays', 'float'),
+    ('successRateLow', 'float'),
+    ('successRateHigh', 'float'),
+    ('bootstrapSuccessRateLow', 'float'),
+    ('bootstrapSuccessRateHigh', 'float'),
+    ('bootstrapAvgDaysLow', 'float'),
+    ('bootstrapAvgDaysHigh', 'float'),
+    ('error', 'string'),
+]
+EXPORT_FIELDNAMES = [name for name, _ in EXPORT_COLUMNS]
+INTERVAL_COLUMNS = ('successRateLow', 'successRateHigh') + BOOTSTRAP_STATS_KEYS
+
+
+def parquet_available():
+    return pa is not None
+
+
+def parse_symbol_list(raw_symbols):
+    """쉼표/공백으로 구분된 심볼 문자열(또는 목록)을 정규화하고 중복 제거"""
+    if isinstance(raw_symbols, str):
+        raw_symbols = re.split(r'[\s,]+', raw_symbols)
+    symbols = []
+    seen = set()
+    for raw_symbol in raw_symbols or []:
+        symbol = str(raw_symbol).strip().upper()
+        if symbol and symbol not in seen:
+            seen.add(symbol)
+            symbols.append(symbol)
+    return symbols
+
+
+def top_ranked_symbols(count, tickers=None):
+    """tickers.json의 rank 기준 상위 N개 심볼"""
+    if tickers is None:
+        tickers = load_tickers()
+    ranked = sorted((stock for stock in tickers if stock.get('symbol')),
+                    key=lambda stock: stock.get('rank') if isinstance(stock.get('rank'), (int, float)) else float('inf'))
+    return [stock['symbol'].upper() for stock in ranked[:count]]
+
+
+def _to_float(value):
+    if value is None:
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+def _to_int(value):
+    return None if value is None else int(value)
+
+
+def _level_type(level):
+    if level['is_current']:
+        return 'current'
+    if level['is_max_drop_1_year']:
+        return 'max_drop_1_year'
+    if level['is_max_drop_this_year']:
+        return 'max_drop_this_year'
+    return 'band'
+
+
+def _error_row(stock_symbol, target_increase_pct, message):
+    row = dict.fromkeys(EXPORT_FIELDNAMES)
+    row.update(symbol=stock_symbol, target_increase_pct=float(target_increase_pct), error=message)
+    return row
+
+
+def export_rows_for_symbol(stock_symbol, target_increase_pct, include_profile=True, bootstrap_resamples=0):
+    """한 종목의 분석 결과를 내보내기용 행 목록으로 변환 (실패 시 error 컬럼에 사유 기록)"""
+    try:
+        df = fetch_price_history(stock_symbol)
+        if df.empty:
+            return [_error_row(stock_symbol, target_increase_pct, '데이터를 찾을 수 없거나 데이터가 부족합니다.')]
+        profile = fetch_stock_profile(stock_symbol) if include_profile else {}
+        stats, price_levels = cached_analyze_stock(stock_symbol, df, target_increase_pct / 100,
+                                                   bootstrap_resamples=bootstrap_resamples)
+    except Exception as e:
+        return [_error_row(stock_symbol, target_increase_pct, str(e))]
+
+    high_52_week = _to_float(stats['high_52_week'])
+    current_price = _to_float(stats['current_price'])
+    latest_quarter_date = profile.get('latest_quarter_date')
+    base_row = {
+        'symbol': stock_symbol,
+        'name': profile.get('stock_name'),
+        'data_as_of': df.index[-1].strftime('%Y-%m-%d'),
+        'target_increase_pct': float(target_increase_pct),
+        'high_52_week': high_52_week,
+        'current_price': current_price,
+        'low_52_week_close': _to_float(stats['low_52_week_close']),
+        'low_this_year_close': _to_float(stats['low_this_year_close']),
+        'current_drop_pct': (1 - current_price / high_52_week) * 100 if high_52_week and current_price else None,
+        'operating_income': _to_float(profile.get('operating_income')),
+        'net_income': _to_float(profile.get('net_income')),
+        'latest_quarter_date': latest_quarter_date.strftime('%Y-%m-%d') if latest_quarter_date is not None else None,
+        'error': None,
+    }
+
+    rows = []
+    for level in price_levels:
+        rows.append({
+            **base_row,
+            'level_type': _level_type(level),
+            'percent_drop': _to_float(level['percent_drop']),
+            'target_price': _to_float(level['target_price']),
+            'successRate': _to_float(level['successRate']),
+            'successCases': _to_int(level['successCases']),
+            'failureCases': _to_int(level['failureCases']),
+            'totalCases': _to_int(level['totalCases']),
+            'avgDays': _to_float(level['avgDays']),
+            **{key: _to_float(level[key]) for key in INTERVAL_COLUMNS},
+        })
+    return rows
+
+
+def iter_export_batches(symbols, target_increase_pct, include_profile=True, bootstrap_resamples=0,
+                        workers=EXPORT_WORKERS, batch_size=EXPORT_BATCH_SIZE):
+    """batch_size 종목씩 병렬로 처리해 행 목록을 입력 순서대로 생성 (한 번에 한 배치만 메모리에 유지)"""
+    def rows_for(symbol):
+        return export_rows_for_symbol(symbol, target_increase_pct, include_profile, bootstrap_resamples)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for start in range(0, len(symbols), batch_size):
+            batch = symbols[start:start + batch_size]
+            rows = []
+            for symbol_rows in executor.map(rows_for, batch):
+                rows.extend(symbol_rows)
+            yield rows
+
+
+def iter_csv(symbols, target_increase_pct, **options):
+    """분석 결과를 CSV 텍스트 청크로 스트리밍 (헤더 포함)"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDNAMES)
+    writer.writeheader()
+    for rows in iter_export_batches(symbols, target_increase_pct, **options):
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+class _ChunkSink:
+    """ParquetWriter가 쓴 바이트를 모아 두었다가 청크 단위로 꺼내 가는 쓰기 전용 버퍼"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self):
+        return True
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def export_schema():
+    types = {'string': pa.string(), 'float': pa.float64(), 'int': pa.int64()}
+    return pa.schema([(name, types[kind]) for name, kind in EXPORT_COLUMNS])
+
+
+def iter_parquet(symbols, target_increase_pct, **options):
+    """분석 결과를 Parquet 바이트 청크로 스트리밍 (배치마다 row group 하나)"""
+    if not parquet_available():
+        raise RuntimeError("Parquet 내보내기에는 pyarrow가 필요합니다.")
+
+    schema = export_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode='w'), schema)
+    try:
+        for rows in iter_export_batches(symbols, target_increase_pct, **options):
+            if rows:
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    yield sink.drain() # 파일 footer
+
+
+def iter_export(export_format, symbols, target_increase_pct, **options):
+    if export_format == 'parquet':
+        return iter_parquet(symbols, target_increase_pct, **options)
+    return iter_csv(symbols, target_increase_pct, **options)
+
+
+def read_export(path, chunksize=None):
+    """내보낸 CSV/Parquet 파일 읽기 (chunksize 지정 시 DataFrame 청크 이터레이터 반환)"""
+    if path.endswith('.parquet'):
+        if not parquet_available():
+            raise RuntimeError("Parquet 파일을 읽으려면 pyarrow가 필요합니다.")
+        if chunksize:
+            return (batch.to_pandas() for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize))
+        return pq.read_table(path).to_pandas()
+    return pd.read_csv(path, chunksize=chunksize)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="여러 종목의 하락률 분석 결과를 CSV/Parquet으로 내보내기")
+    parser.add_argument('symbols', nargs='*', help="종목 심볼 (예: AAPL MSFT)")
+    parser.add_argument('--symbols-file', help="심볼 목록 파일 (쉼표/공백/줄바꿈 구분)")
+    parser.add_argument('--top', type=int, help="tickers.json rank 기준 상위 N개 종목 추가")
+    parser.add_argument('--target', type=float, default=3, help="목표 상승률 (%%, 기본값 3)")
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+    parser.add_argument('-o', '--output', help="출력 파일 (기본값: 표준 출력)")
+    parser.add_argument('--no-profile', action='store_true', help="종목명/재무 데이터 조회 생략")
+    parser.add_argument('--bootstrap', type=int, default=0, help="성공률/평균 달성일 블록 부트스트랩 재표본 수 (0이면 생략)")
+    parser.add_argument('--workers', type=int, default=EXPORT_WORKERS)
+    parser.add_argument('--batch-size', type=int, default=EXPORT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    raw_symbols = list(args.symbols)
+    if args.symbols_file:
+        with open(args.symbols_file, 'r', encoding='utf-8') as f:
+            raw_symbols.extend(re.split(r'[\s,]+', f.read()))
+    if args.top:
+        raw_symbols.extend(top_ranked_symbols(args.top))
+    symbols = parse_symbol_list(raw_symbols)
+    if not symbols:
+        parser.error("내보낼 종목을 하나 이상 지정해주세요.")
+    if not (0 < args.target <= 100):
+        parser.error("목표 상승률은 0% 초과 100% 이하로 입력해주세요.")
+    if args.format == 'parquet' and not parquet_available():
+        parser.error("Parquet 내보내기에는 pyarrow가 필요합니다.")
+
+    if not (0 <= args.bootstrap <= MAX_BOOTSTRAP_RESAMPLES):
+        parser.error(f"부트스트랩 횟수는 0 이상 {MAX_BOOTSTRAP_RESAMPLES} 이하로 입력해주세요.")
+
+    chunks = iter_export(args.format, symbols, args.target, include_profile=not args.no_profile,
+                         bootstrap_resamples=args.bootstrap, workers=args.workers, batch_size=args.batch_size)
+    if args.output:
+        mode = 'wb' if args.format == 'parquet' else 'w'
+        with open(args.output, mode, **({} if mode == 'wb' else {'encoding': 'utf-8', 'newline': ''})) as f:
+            for chunk in chunks:
+                f.write(chunk)
+    else:
+        out = sys.stdout.buffer if args.format == 'parquet' else sys.stdout
+        for chunk in chunks:
+            out.write(chunk)
+        out.flush()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,263 @@
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from analysis import TRADING_DAYS_PER_YEAR
+from breadth import drawdown_band
+from cache import TTLCache
+from market_data import download_bars, fetch_price_history, normalize_bars
+from price_store import DAILY_INTERVAL, load_bars, merge_into_store, store_checked_at, store_mtime
+
+# 장중 봉 간격: 표시 이름, yfinance 조회 기간, 저장소에 남길 거래일 수, 저장소 갱신/화면 새로고침 간격 (초)
+# 남길 거래일 수는 조회 기간 이상이어야 다시 받은 봉이 잘려 나가 저장소가 매번 다시 쓰이지 않음
+INTRADAY_INTERVALS = {
+    '1m': {'name': '1분봉', 'period': '5d', 'keep_sessions': 5, 'refresh_seconds': 15},
+    '1h': {'name': '1시간봉', 'period': '60d', 'keep_sessions': 60, 'refresh_seconds': 60},
+}
+INTRADAY_PROVIDER = os.environ.get('INTRADAY_PROVIDER', 'yfinance') # 장중 데이터 공급자 (yfinance / fixture)
+INTRADAY_FIXTURE_DIR = os.environ.get('INTRADAY_FIXTURE_DIR', os.path.join('fixtures', 'intraday')) # fixture 공급자가 읽을 CSV 위치
+INTRADAY_FEED_TTL = int(os.environ.get('INTRADAY_FEED_TTL', '1800')) # 조회가 없는 종목의 실시간 상태 유지 시간 (초)
+INTRADAY_MAX_FEEDS = int(os.environ.get('INTRADAY_MAX_FEEDS', '256'))
+
+
+class YFinanceIntradayProvider:
+    """yfinance에서 분봉/시간봉(일봉은 캐시된 2020년 이후 데이터) 조회"""
+
+    def fetch_bars(self, stock_symbol, interval):
+        if interval == DAILY_INTERVAL:
+            return fetch_price_history(stock_symbol)
+        return download_bars(stock_symbol, period=INTRADAY_INTERVALS[interval]['period'], interval=interval)
+
+
+class FixtureIntradayProvider:
+    """로컬 CSV 파일({심볼}_{간격}.csv)에서 봉 데이터를 읽는 공급자 (네트워크 없이 테스트/개발할 때 사용)"""
+
+    def __init__(self, fixture_dir=None):
+        self.fixture_dir = fixture_dir or INTRADAY_FIXTURE_DIR
+
+    def fixture_path(self, stock_symbol, interval):
+        safe_symbol = re.sub(r'[^A-Z0-9._-]', '_', stock_symbol.upper())
+        return os.path.join(self.fixture_dir, f"{safe_symbol}_{interval}.csv")
+
+    def fetch_bars(self, stock_symbol, interval):
+        path = self.fixture_path(stock_symbol, interval)
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        return normalize_bars(pd.read_csv(path, index_col=0, parse_dates=True))
+
+
+# 공급자 이름 -> 생성 함수. register_provider()로 새 공급자를 추가할 수 있음
+PROVIDERS = {
+    'yfinance': YFinanceIntradayProvider,
+    'fixture': FixtureIntradayProvider,
+}
+
+
+def register_provider(name, factory):
+    PROVIDERS[name] = factory
+
+
+def get_provider(name=None):
+    name = name or INTRADAY_PROVIDER
+    if name not in PROVIDERS:
+        raise ValueError(f"지원하지 않는 장중 데이터 공급자입니다: {name}")
+    return PROVIDERS[name]()
+
+
+def update_intraday_bars(stock_symbol, interval, provider=None):
+    """공급자에서 최근 장중 봉을 받아 저장소에 추가하고 조회 기간보다 오래된 봉은 버림. 새로 추가된 봉 수 반환"""
+    if interval not in INTRADAY_INTERVALS:
+        raise ValueError(f"지원하지 않는 장중 봉 간격입니다: {interval}")
+    provider = provider or get_provider()
+    return merge_into_store(stock_symbol, provider.fetch_bars(stock_symbol, interval), interval,
+                            keep_sessions=INTRADAY_INTERVALS[interval]['keep_sessions'])
+
+
+def session_keys(index):
+    """봉 시각을 거래일(거래소 현지 날짜, tz 없음)로 변환"""
+    sessions = index.normalize()
+    if sessions.tz is not None:
+        sessions = sessions.tz_localize(None)
+    return sessions
+
+
+class RollingHighTracker:
+    """거래일 단위 롤링 52주 신고점과 현재 하락률을 틱마다 갱신 (틱당 분할 상환 O(1), 메모리는 최대 window개 거래일)
+
+    거래일별 고가 중 이후 거래일 고가보다 높은 값만 단조 감소 deque로 유지하므로,
+    맨 앞 값이 항상 최근 window 거래일(당일 포함)의 최고가가 됨. 일봉의 rolling(window).max()와 같은 값.
+    """
+
+    def __init__(self, window=TRADING_DAYS_PER_YEAR):
+        self.window = window
+        self._highs = deque() # (거래일 번호, 고가), 고가는 앞에서부터 단조 감소
+        self._session = None # 마지막 거래일 키
+        self._session_no = 0
+        self.price = None
+        self.ticks = 0
+
+    def update(self, session, high, price=None):
+        """틱(또는 봉) 하나 반영. 이전 거래일의 틱은 무시하고 False 반환"""
+        if self._session is not None and session < self._session:
+            return False
+        if session != self._session:
+            self._session = session
+            self._session_no += 1
+            # 창을 벗어난 거래일의 고가 제거
+            while self._highs and self._highs[0][0] <= self._session_no - self.window:
+                self._highs.popleft()
+
+        if not (self._highs and self._highs[-1][0] == self._session_no and self._highs[-1][1] >= high):
+            while self._highs and self._highs[-1][1] <= high:
+                self._highs.pop()
+            self._highs.append((self._session_no, high))
+
+        if price is not None:
+            self.price = price
+        self.ticks += 1
+        return True
+
+    @property
+    def high_52_week(self):
+        return self._highs[0][1] if self._highs else None
+
+    @property
+    def drawdown_pct(self):
+        """52주 신고점 대비 현재가 하락률 (%)"""
+        if self.price is None or not self.high_52_week:
+            return None
+        return max((1 - self.price / self.high_52_week) * 100, 0)
+
+
+class IntradayFeed:
+    """한 종목의 장중 봉을 저장소에서 읽어 RollingHighTracker에 새 봉만 반영"""
+
+    def __init__(self, stock_symbol, interval, provider=None):
+        if interval not in INTRADAY_INTERVALS:
+            raise ValueError(f"지원하지 않는 장중 봉 간격입니다: {interval}")
+        self.stock_symbol = stock_symbol
+        self.interval = interval
+        self.provider = provider or get_provider()
+        self.tracker = None
+        self.last_timestamp = None # 마지막으로 반영한 봉 시각 (이 시각 이후 봉만 새로 반영)
+        self._mtime = None # 마지막으로 읽은 저장소 파일 수정 시각
+        self._lock = threading.Lock()
+
+    def _update_store_if_stale(self):
+        checked_at = store_checked_at(self.stock_symbol, self.interval)
+        refresh_seconds = INTRADAY_INTERVALS[self.interval]['refresh_seconds']
+        if checked_at is not None and time.time() - checked_at <= refresh_seconds:
+            return
+        try:
+            update_intraday_bars(self.stock_symbol, self.interval, self.provider)
+        except Exception as e:
+            if checked_at is None:
+                raise
+            print(f"장중 데이터 갱신 실패 ({self.stock_symbol}, {self.interval}), 저장된 데이터 사용: {e}")
+
+    def _seed(self, first_session):
+        """첫 장중 거래일 이전의 일봉 고가로 52주 창을 채움"""
+        self.tracker = RollingHighTracker()
+        daily = load_bars(self.stock_symbol)
+        if daily.empty:
+            daily = self.provider.fetch_bars(self.stock_symbol, DAILY_INTERVAL)
+        if daily.empty:
+            return
+        daily = daily[session_keys(daily.index) < first_session].tail(TRADING_DAYS_PER_YEAR)
+        for session, high, close in zip(session_keys(daily.index), daily['High'].to_numpy(dtype=float),
+                                        daily['Close'].to_numpy(dtype=float)):
+            self.tracker.update(session, high, close)
+
+    def refresh(self):
+        """저장소가 바뀌었으면 마지막 반영 시각 이후의 봉만 반영. 반영한 봉 수 반환"""
+        with self._lock:
+            self._update_store_if_stale()
+            mtime = store_mtime(self.stock_symbol, self.interval)
+            if mtime is None or mtime == self._mtime:
+                return 0
+            self._mtime = mtime
+
+            bars = load_bars(self.stock_symbol, use_cache=False, interval=self.interval)
+            if bars.empty:
+                return 0
+            if self.last_timestamp is not None:
+                # 마지막 봉은 진행 중에 값이 바뀔 수 있으므로 다시 반영 (고가의 최댓값이라 중복 반영해도 결과는 같음)
+                bars = bars[bars.index >= self.last_timestamp]
+
+            sessions = session_keys(bars.index)
+            if self.tracker is None:
+                self._seed(sessions[0])
+            for session, high, close in zip(sessions, bars['High'].to_numpy(dtype=float), bars['Close'].to_numpy(dtype=float)):
+                if not np.isnan(high):
+                    self.tracker.update(session, high, close)
+            self.last_timestamp = bars.index[-1]
+            return len(bars)
+
+    def snapshot(self):
+        if self.tracker is None or self.tracker.drawdown_pct is None:
+            return None
+        drawdown_pct = self.tracker.drawdown_pct
+        return {
+            'symbol': self.stock_symbol,
+            'interval': self.interval,
+            'as_of': self.last_timestamp.isoformat(),
+            'price': round(float(self.tracker.price), 4),
+            'high_52_week': round(float(self.tracker.high_52_week), 4),
+            'drawdown_pct': round(float(drawdown_pct), 2),
+            'band': drawdown_band(drawdown_pct),
+            'refresh_seconds': INTRADAY_INTERVALS[self.interval]['refresh_seconds'],
+        }
+
+
+# (심볼, 간격) -> IntradayFeed (한동안 조회가 없으면 만료)
+live_feeds = TTLCache(INTRADAY_FEED_TTL, max_entries=INTRADAY_MAX_FEEDS)
+_live_feeds_lock = threading.Lock()
+
+
+def get_live_snapshot(stock_symbol, interval):
+    """종목의 실시간 52주 신고점/하락률/구간 (장중 데이터가 없으면 None)"""
+    with _live_feeds_lock:
+        feed = live_feeds.get((stock_symbol, interval))
+        if feed is None:
+            feed = IntradayFeed(stock_symbol, interval)
+        live_feeds.set((stock_symbol, interval), feed) # 조회할 때마다 만료 시각 연장
+    feed.refresh()
+    snapshot = feed.snapshot()
+    if snapshot is None:
+        # 데이터가 없는 종목(잘못된 심볼 등)은 자리를 차지하지 않도록 제거 (재조회는 저장소 확인 시각으로 제한됨)
+        live_feeds.pop((stock_symbol, interval))
+    return snapshot
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="장중 봉으로 52주 신고점 대비 실시간 하락률 계산")
+    parser.add_argument('symbols', nargs='+')
+    parser.add_argument('--interval', choices=list(INTRADAY_INTERVALS), default='1m')
+    parser.add_argument('--provider', choices=list(PROVIDERS), default=INTRADAY_PROVIDER)
+    parser.add_argument('--watch', action='store_true', help="간격마다 저장소를 갱신하며 계속 출력")
+    args = parser.parse_args(argv)
+
+    provider = get_provider(args.provider)
+    feeds = [IntradayFeed(symbol.upper(), args.interval, provider) for symbol in args.symbols]
+    while True:
+        for feed in feeds:
+            try:
+                feed.refresh()
+                print(json.dumps(feed.snapshot(), ensure_ascii=False))
+            except Exception as e:
+                print(f"실시간 하락률 계산 실패 ({feed.stock_symbol}): {e}", file=sys.stderr)
+        if not args.watch:
+            return 0
+        time.sleep(INTRADAY_INTERVALS[args.interval]['refresh_seconds'])
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,538 @@
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import zlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from market_data import load_tickers
+
+LOADTEST_PRICE_LATENCY_MS = float(os.environ.get('LOADTEST_PRICE_LATENCY_MS', '300')) # 가짜 가격 조회 지연 (yf.download)
+LOADTEST_INFO_LATENCY_MS = float(os.environ.get('LOADTEST_INFO_LATENCY_MS', '500')) # 가짜 종목 정보 조회 지연 (Ticker.info)
+
+AUTOCOMPLETE_DEBOUNCE_MS = 200 # templates/index.html의 자동완성 debounce와 같은 값
+KEYSTROKE_GAP_MS = (60, 350) # 키 입력 간격 범위 (이 간격이 debounce보다 길면 그 시점의 입력으로 검색 요청 발생)
+REPEAT_POST_PROBABILITY = 0.3 # 분석 후 목표 상승률만 바꿔 다시 제출할 확률
+SHARED_LINK_PROBABILITY = 0.2 # 분석 결과 링크(GET /?stock_symbol=...)를 다시 열 확률
+TARGET_CHOICES = (3, 3, 3, 5, 10) # 목표 상승률 분포 (기본값 3%가 가장 많음)
+THINK_TIME_SECONDS = {'after_search': (0.3, 1.5), 'after_result': (2.0, 8.0)}
+SYMBOL_ZIPF_EXPONENT = 1.1 # 시가총액 상위 종목일수록 자주 조회
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__)) # gunicorn 실행 위치 (tickers.json 기준)
+
+
+# --- 가짜 가격/종목 정보 공급자 (yfinance 대체) ---
+
+def _symbol_seed(stock_symbol):
+    return zlib.crc32(stock_symbol.upper().encode('utf-8'))
+
+
+def fake_download(tickers, start=None, period=None, interval='1d', **kwargs):
+    """yf.download 대체: 심볼별로 항상 같은 가짜 일봉을 LOADTEST_PRICE_LATENCY_MS 지연 후 반환"""
+    time.sleep(LOADTEST_PRICE_LATENCY_MS / 1000)
+    if interval != '1d':
+        return pd.DataFrame()
+    index = pd.bdate_range(start or '2000-01-03', pd.Timestamp.today().normalize())
+    rng = np.random.default_rng(_symbol_seed(tickers))
+    close = 50 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, len(index))))
+    high = close * (1 + rng.uniform(0, 0.02, len(index)))
+    low = close * (1 - rng.uniform(0, 0.02, len(index)))
+    return pd.DataFrame({'Open': close, 'High': high, 'Low': low, 'Close': close, 'Adj Close': close,
+                         'Volume': rng.integers(10 ** 5, 10 ** 7, len(index))}, index=index)
+
+
+class FakeTicker:
+    """yf.Ticker 대체: 종목명과 최근 분기 재무 데이터를 LOADTEST_INFO_LATENCY_MS 지연 후 반환"""
+
+    def __init__(self, stock_symbol):
+        self.stock_symbol = stock_symbol.upper()
+
+    @property
+    def info(self):
+        time.sleep(LOADTEST_INFO_LATENCY_MS / 1000)
+        return {'longName': f"{self.stock_symbol} Inc."}
+
+    @property
+    def quarterly_financials(self):
+        rng = np.random.default_rng(_symbol_seed(self.stock_symbol))
+        quarter = pd.Timestamp.today().normalize() - pd.offsets.QuarterEnd(1)
+        return pd.DataFrame({quarter: [float(rng.uniform(1e8, 1e10)), float(rng.uniform(1e7, 1e9))]},
+                            index=['Operating Income', 'Net Income'])
+
+
+def create_fake_app():
+    """가짜 공급자를 설치한 Flask 앱 (gunicorn 'loadtest:create_fake_app()'로 실행)"""
+    import yfinance as yf
+    yf.download = fake_download
+    yf.Ticker = FakeTicker
+
+    from app import app
+    return app
+
+
+# --- 가상 사용자 ---
+
+def zipf_weights(count, exponent=SYMBOL_ZIPF_EXPONENT):
+    ranks = np.arange(1, count + 1)
+    weights = 1 / ranks ** exponent
+    return (weights / weights.sum()).tolist()
+
+
+class VirtualUser:
+    """index.html 사용 흐름을 따라 요청을 보내는 사용자 (자동완성 입력 -> 분석 POST -> 재제출/링크 재방문)"""
+
+    def __init__(self, host, port, symbols, weights, seed, think_time_scale, record):
+        self.host = host
+        self.port = port
+        self.symbols = symbols
+        self.weights = weights
+        self.rng = random.Random(seed)
+        self.think_time_scale = think_time_scale
+        self.record = record # (endpoint, 지연 초, 성공 여부) 기록 함수
+        self.conn = None
+
+    def request(self, stop_event, endpoint, method, path, body=None):
+        """요청 하나를 보내고 지연 기록 (단계가 끝났으면 새 요청을 보내지 않고 False 반환)"""
+        if stop_event.is_set():
+            return False
+        headers = {}
+        if body is not None:
+            body = urllib.parse.urlencode(body)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        started = time.perf_counter()
+        try:
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            self.conn.request(method, path, body=body, headers=headers)
+            response = self.conn.getresponse()
+            response.read()
+            ok = response.status < 400
+        except (OSError, http.client.HTTPException):
+            ok = False
+            if self.conn is not None:
+                self.conn.close()
+            self.conn = None
+        self.record(endpoint, time.perf_counter() - started, ok)
+        return True
+
+    def think(self, kind, stop_event):
+        low, high = THINK_TIME_SECONDS[kind]
+        stop_event.wait(self.rng.uniform(low, high) * self.think_time_scale)
+
+    def type_symbol(self, stock_symbol, stop_event):
+        """한 글자씩 입력하며, 다음 입력까지 debounce보다 오래 멈춘 시점(마지막 글자 포함)마다 /search_stock 요청"""
+        for i in range(1, len(stock_symbol) + 1):
+            gap_ms = self.rng.uniform(*KEYSTROKE_GAP_MS) if i < len(stock_symbol) else None
+            if gap_ms is None or gap_ms > AUTOCOMPLETE_DEBOUNCE_MS:
+                query = urllib.parse.quote(stock_symbol[:i])
+                if not self.request(stop_event, 'search_stock', 'GET', f"/search_stock?query={query}"):
+                    return
+            if gap_ms is not None:
+                stop_event.wait(gap_ms / 1000 * self.think_time_scale)
+
+    def run_session(self, stop_event):
+        stock_symbol = self.rng.choices(self.symbols, weights=self.weights)[0]
+        target = self.rng.choice(TARGET_CHOICES)
+        self.type_symbol(stock_symbol, stop_event)
+        self.think('after_search', stop_event)
+        self.request(stop_event, 'index_post', 'POST', '/', {'stock_symbol': stock_symbol, 'target_increase_pct': target})
+        self.think('after_result', stop_event)
+
+        if self.rng.random() < REPEAT_POST_PROBABILITY:
+            target = self.rng.choice([choice for choice in TARGET_CHOICES if choice != target])
+            self.request(stop_event, 'index_post', 'POST', '/', {'stock_symbol': stock_symbol, 'target_increase_pct': target})
+            self.think('after_result', stop_event)
+        if self.rng.random() < SHARED_LINK_PROBABILITY:
+            self.request(stop_event, 'index_get', 'GET', f"/?stock_symbol={urllib.parse.quote(stock_symbol)}&target={target}")
+            self.think('after_result', stop_event)
+
+    def run(self, stop_event):
+        while not stop_event.is_set():
+            self.run_session(stop_event)
+        if self.conn is not None:
+            self.conn.close()
+
+
+# --- 메모리 측정 (Linux /proc) ---
+
+def rss_mb(pid):
+    """프로세스 상주 메모리(MB), 읽을 수 없으면 None"""
+    try:
+        with open(f"/proc/{pid}/status", encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def child_pids(pid):
+    """gunicorn 마스터의 워커 프로세스 목록"""
+    children = []
+    try:
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat", encoding='utf-8') as f:
+                    # comm에 공백/괄호가 있을 수 있으므로 마지막 ')' 이후를 파싱
+                    fields = f.read().rsplit(')', 1)[1].split()
+            except OSError:
+                continue
+            if int(fields[1]) == pid:
+                children.append(int(entry))
+    except OSError:
+        pass
+    return sorted(children)
+
+
+class MemorySampler:
+    """단계 실행 중 마스터/워커의 최대 상주 메모리 기록"""
+
+    def __init__(self, master_pid, interval=0.5):
+        self.master_pid = master_pid
+        self.interval = interval
+        self.peaks = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self):
+        for pid in [self.master_pid] + child_pids(self.master_pid):
+            rss = rss_mb(pid)
+            if rss is not None:
+                self.peaks[pid] = max(self.peaks.get(pid, 0), rss)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        self.peaks = {}
+        self._stop.clear()
+        self.sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+        workers = sorted((rss for pid, rss in self.peaks.items() if pid != self.master_pid), reverse=True)
+        return {'master_rss_mb': self.peaks.get(self.master_pid), 'worker_rss_mb': workers}
+
+
+# --- 단계 실행과 집계 ---
+
+def summarize_latencies(latencies):
+    if not latencies:
+        return {'p50_ms': None, 'p95_ms': None, 'p99_ms': None}
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    return {'p50_ms': round(float(p50), 1), 'p95_ms': round(float(p95), 1), 'p99_ms': round(float(p99), 1)}
+
+
+def run_stage(host, port, concurrency, duration, symbols, weights, seed, think_time_scale, sampler=None):
+    """동시 사용자 concurrency명으로 duration초 동안 부하를 주고 엔드포인트별 처리량/지연 집계
+
+    단계가 끝날 때(stop_event 설정 시) 진행 중이던 요청은 처리량/지연에서 빼고 late로만 셈
+    """
+    results = {} # endpoint -> {'latencies': [...], 'errors': n, 'late': n}
+    lock = threading.Lock()
+    stage_end = None
+
+    def record(endpoint, elapsed, ok):
+        finished = time.perf_counter()
+        with lock:
+            result = results.setdefault(endpoint, {'latencies': [], 'errors': 0, 'late': 0})
+            if stage_end is not None:
+                if finished - elapsed < stage_end: # 종료 직후 시작된 요청은 세지 않음
+                    result['late'] += 1
+            elif ok:
+                result['latencies'].append(elapsed)
+            else:
+                result['errors'] += 1
+
+    stop_event = threading.Event()
+    users = [VirtualUser(host, port, symbols, weights, seed * 100003 + i, think_time_scale, record)
+             for i in range(concurrency)]
+    threads = [threading.Thread(target=user.run, args=(stop_event,), daemon=True) for user in users]
+    if sampler is not None:
+        sampler.start()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    stop_event.wait(duration)
+    with lock:
+        stage_end = time.perf_counter()
+        stop_event.set()
+    for thread in threads:
+        thread.join()
+    elapsed = stage_end - started
+    memory = sampler.stop() if sampler is not None else {'master_rss_mb': None, 'worker_rss_mb': []}
+
+    endpoints = {}
+    all_latencies = []
+    total_errors = 0
+    total_late = 0
+    for endpoint in sorted(results):
+        result = results[endpoint]
+        all_latencies.extend(result['latencies'])
+        total_errors += result['errors']
+        total_late += result['late']
+        endpoints[endpoint] = {
+            'requests': len(result['latencies']) + result['errors'],
+            'errors': result['errors'],
+            'late': result['late'],
+            'throughput_rps': round(len(result['latencies']) / elapsed, 2),
+            **summarize_latencies(result['latencies']),
+        }
+
+    return {
+        'concurrency': concurrency,
+        'duration_s': round(elapsed, 1),
+        'requests': len(all_latencies) + total_errors,
+        'errors': total_errors,
+        'late': total_late,
+        'throughput_rps': round(len(all_latencies) / elapsed, 2),
+        **summarize_latencies(all_latencies),
+        'endpoints': endpoints,
+        **memory,
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(host, port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=5)
+            conn.request('GET', '/search_stock?query=A')
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{timeout}초 안에 서버가 응답하지 않았습니다.")
+
+
+def start_gunicorn(port, workers, threads, worker_class, workdir):
+    """가짜 공급자를 설치한 앱을 gunicorn으로 실행 (가격 저장소/알림 DB는 임시 디렉터리 사용)"""
+    env = dict(os.environ,
+               LOADTEST_PRICE_LATENCY_MS=str(LOADTEST_PRICE_LATENCY_MS),
+               LOADTEST_INFO_LATENCY_MS=str(LOADTEST_INFO_LATENCY_MS),
+               PRICE_STORE_DIR=os.path.join(workdir, 'price_store'),
+               ALERT_DB_PATH=os.path.join(workdir, 'alerts.db'),
+               ALERT_SCHEDULER='0')
+    command = [sys.executable, '-m', 'gunicorn',
+               '--bind', f"127.0.0.1:{port}",
+               '--workers', str(workers),
+               '--threads', str(threads),
+               '--worker-class', worker_class,
+               '--log-level', 'warning',
+               'loadtest:create_fake_app()']
+    return subprocess.Popen(command, cwd=APP_DIR, env=env)
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=APP_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def format_report(report):
+    """단계별 결과를 Markdown 표로 변환"""
+    config = report['config']
+    lines = [
+        f"# 부하 테스트 결과 ({config['revision'] or 'unknown'})",
+        '',
+        f"- 대상: {config['target']}",
+        f"- 워커: {config['workers']} x 스레드 {config['threads']} ({config['worker_class']})",
+        f"- 가짜 공급자 지연: 가격 {config['price_latency_ms']:g}ms / 종목 정보 {config['info_latency_ms']:g}ms",
+        f"- 단계 길이 {config['duration_s']:g}초, 생각 시간 배율 {config['think_time_scale']:g}, seed {config['seed']}",
+        '',
+        '| 동시 사용자 | 요청 | 오류 | 종료 후 완료 | 처리량 (req/s) | p50 (ms) | p95 (ms) | p99 (ms) | 워커 최대 메모리 (MB) |',
+        '|---:|---:|---:|---:|---:|---:|---:|---:|---|',
+    ]
+    for stage in report['stages']:
+        workers_rss = ', '.join(f"{rss:g}" for rss in stage['worker_rss_mb']) or 'N/A'
+        lines.append(f"| {stage['concurrency']} | {stage['requests']} | {stage['errors']} | {stage.get('late', 0)} | "
+                     f"{stage['throughput_rps']} | {stage['p50_ms']} | {stage['p95_ms']} | {stage['p99_ms']} | {workers_rss} |")
+
+    lines += ['', '| 동시 사용자 | 엔드포인트 | 요청 | 오류 | 종료 후 완료 | 처리량 (req/s) | p50 (ms) | p95 (ms) | p99 (ms) |',
+              '|---:|---|---:|---:|---:|---:|---:|---:|---:|']
+    for stage in report['stages']:
+        for endpoint, result in stage['endpoints'].items():
+            lines.append(f"| {stage['concurrency']} | {endpoint} | {result['requests']} | {result['errors']} | "
+                         f"{result.get('late', 0)} | {result['throughput_rps']} | {result['p50_ms']} | {result['p95_ms']} | "
+                         f"{result['p99_ms']} |")
+    return '\n'.join(lines) + '\n'
+
+
+def compare_reports(base, new):
+    """두 보고서의 같은 동시 사용자 단계끼리 처리량/p95 변화율을 Markdown 표로 비교"""
+    def change(old, value):
+        if not old or value is None:
+            return 'N/A'
+        return f"{(value - old) / old * 100:+.1f}%"
+
+    def describe(config):
+        if config['workers'] is None:
+            return f"{config['revision']} ({config['target']})"
+        return f"{config['revision']} ({config['workers']}x{config['threads']} {config['worker_class']})"
+
+    base_stages = {stage['concurrency']: stage for stage in base['stages']}
+    lines = [
+        f"# 부하 테스트 비교: {describe(base['config'])} -> {describe(new['config'])}",
+        '',
+        '| 동시 사용자 | 처리량 (req/s) | 변화 | p95 (ms) | 변화 | p99 (ms) | 변화 | 워커 최대 메모리 (MB) |',
+        '|---:|---:|---:|---:|---:|---:|---:|---|',
+    ]
+    for stage in new['stages']:
+        old = base_stages.get(stage['concurrency'])
+        if old is None:
+            continue
+        old_rss = max(old['worker_rss_mb'], default=None)
+        new_rss = max(stage['worker_rss_mb'], default=None)
+        lines.append(f"| {stage['concurrency']} | {old['throughput_rps']} -> {stage['throughput_rps']} | "
+                     f"{change(old['throughput_rps'], stage['throughput_rps'])} | "
+                     f"{old['p95_ms']} -> {stage['p95_ms']} | {change(old['p95_ms'], stage['p95_ms'])} | "
+                     f"{old['p99_ms']} -> {stage['p99_ms']} | {change(old['p99_ms'], stage['p99_ms'])} | "
+                     f"{old_rss} -> {new_rss} |")
+    return '\n'.join(lines) + '\n'
+
+
+def run_load_test(args):
+    tickers = [stock for stock in load_tickers(os.path.join(APP_DIR, 'tickers.json')) if stock.get('symbol')]
+    tickers.sort(key=lambda stock: stock.get('rank') if isinstance(stock.get('rank'), (int, float)) else float('inf'))
+    symbols = [stock['symbol'].upper() for stock in tickers[:args.symbols]]
+    if not symbols:
+        raise RuntimeError("tickers.json에서 종목을 읽지 못했습니다.")
+    weights = zipf_weights(len(symbols))
+
+    server = None
+    sampler = None
+    with tempfile.TemporaryDirectory(prefix='loadtest-') as workdir:
+        if args.url:
+            parsed = urllib.parse.urlsplit(args.url)
+            host, port = parsed.hostname, parsed.port or 80
+            if args.pid:
+                sampler = MemorySampler(args.pid)
+        else:
+            host, port = '127.0.0.1', free_port()
+            server = start_gunicorn(port, args.workers, args.threads, args.worker_class, workdir)
+            sampler = MemorySampler(server.pid)
+        try:
+            wait_until_ready(host, port)
+            if args.warmup > 0:
+                run_stage(host, port, max(args.concurrency), args.warmup, symbols, weights, args.seed, args.think_time_scale)
+
+            stages = []
+            for concurrency in args.concurrency:
+                stage = run_stage(host, port, concurrency, args.duration, symbols, weights, args.seed,
+                                  args.think_time_scale, sampler)
+                print(f"동시 사용자 {concurrency}: {stage['throughput_rps']} req/s, p95 {stage['p95_ms']}ms, "
+                      f"오류 {stage['errors']}, 종료 후 완료 {stage['late']}", file=sys.stderr)
+                stages.append(stage)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+
+    return {
+        'config': {
+            'revision': git_revision(),
+            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'target': args.url or 'gunicorn (local, fake provider)',
+            'workers': args.workers if not args.url else None,
+            'threads': args.threads if not args.url else None,
+            'worker_class': args.worker_class if not args.url else None,
+            'price_latency_ms': LOADTEST_PRICE_LATENCY_MS,
+            'info_latency_ms': LOADTEST_INFO_LATENCY_MS,
+            'duration_s': args.duration,
+            'warmup_s': args.warmup,
+            'think_time_scale': args.think_time_scale,
+            'symbols': len(symbols),
+            'seed': args.seed,
+        },
+        'stages': stages,
+    }
+
+
+def parse_concurrency(raw_value):
+    levels = sorted({int(level) for level in raw_value.split(',') if level.strip()})
+    if not levels or levels[0] < 1:
+        raise argparse.ArgumentTypeError("동시 사용자 수는 1 이상의 정수를 쉼표로 구분해 입력해주세요.")
+    return levels
+
+
+def main(argv=None):
+    global LOADTEST_PRICE_LATENCY_MS, LOADTEST_INFO_LATENCY_MS
+
+    parser = argparse.ArgumentParser(description="가짜 가격/종목 정보 공급자로 gunicorn 배포의 처리량/지연/메모리 측정")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="부하 테스트 실행")
+    run_parser.add_argument('--concurrency', type=parse_concurrency, default=parse_concurrency('1,2,4,8,16,32'),
+                            help="단계별 동시 사용자 수 (기본값 1,2,4,8,16,32)")
+    run_parser.add_argument('--duration', type=float, default=30, help="단계별 실행 시간 (초)")
+    run_parser.add_argument('--warmup', type=float, default=5, help="측정 전 예열 시간 (초, 결과에서 제외)")
+    run_parser.add_argument('--workers', type=int, default=2, help="gunicorn 워커 수")
+    run_parser.add_argument('--threads', type=int, default=1, help="gunicorn 워커당 스레드 수")
+    run_parser.add_argument('--worker-class', default='sync', help="gunicorn 워커 종류 (sync, gthread 등)")
+    run_parser.add_argument('--price-latency-ms', type=float, default=LOADTEST_PRICE_LATENCY_MS)
+    run_parser.add_argument('--info-latency-ms', type=float, default=LOADTEST_INFO_LATENCY_MS)
+    run_parser.add_argument('--think-time-scale', type=float, default=1.0,
+                            help="사용자 생각 시간/키 입력 간격 배율 (0이면 쉬지 않고 요청)")
+    run_parser.add_argument('--symbols', type=int, default=500, help="조회할 시가총액 상위 종목 수")
+    run_parser.add_argument('--seed', type=int, default=52)
+    run_parser.add_argument('--url', help="이미 실행 중인 서버 주소 (지정하면 gunicorn을 직접 띄우지 않음)")
+    run_parser.add_argument('--pid', type=int, help="--url 사용 시 메모리를 측정할 gunicorn 마스터 PID")
+    run_parser.add_argument('--output', help="JSON 보고서 저장 경로 (Markdown 표는 같은 이름의 .md로 저장)")
+
+    compare_parser = subparsers.add_parser('compare', help="두 JSON 보고서 비교")
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('new')
+    args = parser.parse_args(argv)
+
+    if args.command == 'compare':
+        with open(args.base, encoding='utf-8') as f:
+            base = json.load(f)
+        with open(args.new, encoding='utf-8') as f:
+            new = json.load(f)
+        sys.stdout.write(compare_reports(base, new))
+        return 0
+
+    LOADTEST_PRICE_LATENCY_MS = args.price_latency_ms
+    LOADTEST_INFO_LATENCY_MS = args.info_latency_ms
+    report = run_load_test(args)
+    markdown = format_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write('\n')
+        with open(os.path.splitext(args.output)[0] + '.md', 'w', encoding='utf-8') as f:
+            f.write(markdown)
+    sys.stdout.write(markdown)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,146 @@
+import json
+import os
+
+import pandas as pd
+import yfinance as yf
+
+from cache import ByteLRUCache, TTLCache, frame_version
+
+PRICE_HISTORY_START = '2020-01-01' # 분석 시작 날짜는 넉넉하게 설정
+PRICE_CACHE_TTL = int(os.environ.get('PRICE_CACHE_TTL', '600')) # 가격/종목 정보 캐시 유지 시간 (초)
+RESAMPLE_CACHE_MAX_BYTES = int(os.environ.get('RESAMPLE_CACHE_MAX_BYTES', str(64 * 1024 * 1024))) # 주봉/월봉 변환 결과 캐시 최대 크기
+
+# 분석 해상도: 리샘플링 규칙, 1년에 해당하는 봉 수, 소요 기간 표시 단위, 표시 이름
+RESOLUTIONS = {
+    'daily': {'rule': None, 'bars_per_year': 252, 'label': '거래일', 'name': '일봉'},
+    'weekly': {'rule': 'W-FRI', 'bars_per_year': 52, 'label': '주', 'name': '주봉'},
+    'monthly': {'rule': 'ME', 'bars_per_year': 12, 'label': '개월', 'name': '월봉'},
+}
+OHLC_AGGREGATIONS = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Adj Close': 'last', 'Volume': 'sum'}
+
+price_history_cache = TTLCache(PRICE_CACHE_TTL, max_entries=512)
+stock_profile_cache = TTLCache(PRICE_CACHE_TTL, max_entries=512)
+resampled_bars_cache = ByteLRUCache(RESAMPLE_CACHE_MAX_BYTES)
+
+
+def load_tickers(path='tickers.json'):
+    """tickers.json 로드 (실패 시 빈 목록)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        print("Error: tickers.json not found. Autocomplete will not work.")
+    except json.JSONDecodeError:
+        print("Error: tickers.json is not a valid JSON file. Autocomplete will not work.")
+    except Exception as e:
+        print(f"An unexpected error occurred while loading tickers.json: {e}")
+    return []
+
+def format_financial_number(value):
+    """재무 수치를 적절한 단위로 포맷팅"""
+    if pd.isna(value) or value is None:
+        return None
+    
+    abs_value = abs(value)
+    if abs_value >= 1_000_000_000:
+        return f"{value / 1_000_000_000:.2f}B"
+    elif abs_value >= 1_000_000:
+        return f"{value / 1_000_000:.2f}M"
+    elif abs_value >= 1_000:
+        return f"{value / 1_000:.2f}K"
+    else:
+        return f"{value:.2f}"
+
+def normalize_bars(df):
+    """yfinance 결과 정리 (Ticker 컬럼 레벨 제거, 종가가 있는 행만, 날짜순 정렬)"""
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.droplevel('Ticker')
+
+    df = df[df['Close'].notna()] # 종가 데이터가 있는 행만 사용
+    return df.sort_index()
+
+def download_bars(stock_symbol, start=None, **kwargs):
+    """yfinance에서 봉 데이터 다운로드 (start가 없으면 전체 기간, 분봉 등은 interval/period를 kwargs로 전달)"""
+    if start is None:
+        kwargs.setdefault('period', 'max')
+    df = yf.download(stock_symbol, start=start, progress=False, auto_adjust=False, **kwargs)
+    return normalize_bars(df)
+
+def resample_bars(df, resolution):
+    """일봉을 주봉/월봉으로 변환 (OHLC 규칙에 맞춰 집계)
+
+    W-FRI/ME는 구간 끝 날짜를 이름으로 쓰므로, 진행 중인 마지막 주/월은 미래 날짜 대신 실제 마지막 봉 날짜로 표시
+    """
+    rule = RESOLUTIONS[resolution]['rule']
+    if rule is None or df.empty:
+        return df
+    aggregations = {column: how for column, how in OHLC_AGGREGATIONS.items() if column in df.columns}
+    resampled = df.resample(rule).agg(aggregations)
+    resampled = resampled[resampled['Close'].notna()]
+    if resampled.index[-1] > df.index[-1]:
+        resampled.index = resampled.index[:-1].append(df.index[-1:])
+    return resampled
+
+def get_resampled_bars(stock_symbol, df, resolution):
+    """resample_bars 결과를 (심볼, 데이터 버전, 해상도) 기준으로 캐시해 해상도 전환 시 재사용"""
+    if RESOLUTIONS[resolution]['rule'] is None or df.empty:
+        return df
+    cache_key = (stock_symbol, frame_version(df), resolution)
+    resampled = resampled_bars_cache.get(cache_key)
+    if resampled is None:
+        resampled = resample_bars(df, resolution)
+        resampled_bars_cache.set(cache_key, resampled)
+    return resampled
+
+def fetch_price_history(stock_symbol, start_date=PRICE_HISTORY_START):
+    """일봉 데이터 조회 (종가가 있는 행만, 날짜순 정렬 / TTL 캐시 적용)"""
+    cache_key = (stock_symbol, start_date)
+    df = price_history_cache.get(cache_key)
+    if df is not None:
+        return df
+
+    df = download_bars(stock_symbol, start=start_date)
+
+    if not df.empty:
+        price_history_cache.set(cache_key, df)
+    return df
+
+def fetch_stock_profile(stock_symbol):
+    """종목명과 최근 분기 재무 데이터 조회 (TTL 캐시 적용)"""
+    profile = stock_profile_cache.get(stock_symbol)
+    if profile is not None:
+        return profile
+
+    ticker = yf.Ticker(stock_symbol)
+    stock_info = ticker.info
+    profile = {
+        'stock_name': stock_info.get('longName', stock_symbol),
+        'operating_income': None,
+        'net_income': None,
+        'latest_quarter_date': None,
+        'operating_income_formatted': None,
+        'net_income_formatted': None,
+        'latest_quarter_date_formatted': None,
+    }
+
+    # 재무 데이터 가져오기
+    try:
+        financials = ticker.quarterly_financials 
+        if not financials.empty and 'Operating Income' in financials.index and 'Net Income' in financials.index:
+            latest_quarter_date = financials.columns[0] # 가장 최근 분기
+            profile['latest_quarter_date'] = latest_quarter_date
+            profile['latest_quarter_date_formatted'] = latest_quarter_date.strftime('%Y-%m-%d')
+            
+            operating_income = financials.loc['Operating Income', latest_quarter_date]
+            profile['operating_income'] = operating_income
+            profile['operating_income_formatted'] = format_financial_number(operating_income)
+            
+            net_income = financials.loc['Net Income', latest_quarter_date]
+            profile['net_income'] = net_income
+            profile['net_income_formatted'] = format_financial_number(net_income)
+                
+    except Exception as e:
+        print(f"재무 데이터 가져오기 실패 또는 데이터 없음: {e}")
+
+    stock_profile_cache.set(stock_symbol, profile)
+    return profile
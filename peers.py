@@ -0,0 +1,199 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from analysis import DRAWDOWN_BANDS, TRADING_DAYS_PER_YEAR, extract_band_events, wilson_interval
+from cache import ByteLRUCache
+from market_data import PRICE_HISTORY_START
+from price_store import load_bars, store_mtime
+
+PEERS_WORKERS = int(os.environ.get('PEERS_WORKERS', str(min(4, os.cpu_count() or 1)))) # 이벤트 추출 프로세스 수 (1이면 현재 프로세스에서 처리)
+PEERS_PROCESS_THRESHOLD = int(os.environ.get('PEERS_PROCESS_THRESHOLD', '32')) # 새로 추출할 종목이 이 수 이상일 때만 멀티프로세스 사용
+PEER_EVENT_CACHE_MAX_BYTES = int(os.environ.get('PEER_EVENT_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+MAX_PEER_SYMBOLS = int(os.environ.get('MAX_PEER_SYMBOLS', '2000'))
+
+# (심볼, 저장소 파일 수정 시각, 목표 상승률, 시작일, 1년 봉 수) -> 종목별 이벤트 열 배열
+event_cache = ByteLRUCache(PEER_EVENT_CACHE_MAX_BYTES, sizeof=lambda events: sum(column.nbytes for column in events.values()))
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool(workers):
+    """요청마다 프로세스를 새로 띄우지 않도록 프로세스 풀을 한 번만 만들어 재사용
+
+    웹 워커는 여러 스레드가 도는 프로세스라 fork 대신 forkserver(없으면 spawn)로 작업 프로세스를 만듦
+    """
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            _process_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+        return _process_pool
+
+
+def _reset_process_pool(pool):
+    """깨진 프로세스 풀(작업 프로세스 비정상 종료)을 버려 다음 요청에서 새로 만들도록 함"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def extract_symbol_events(stock_symbol, target_increase_pct_ratio, start_date=PRICE_HISTORY_START,
+                          bars_per_year=TRADING_DAYS_PER_YEAR):
+    """가격 저장소의 일봉으로 한 종목의 하락률 구간 이벤트 추출 (데이터가 없으면 None)"""
+    df = load_bars(stock_symbol, use_cache=False)
+    if start_date and not df.empty:
+        df = df[df.index >= start_date]
+    if df.empty:
+        return None
+    return extract_band_events(df, target_increase_pct_ratio, bars_per_year)
+
+
+def _extract_task(task):
+    """프로세스 풀 작업 단위 (예외는 None으로 바꿔 다른 종목 처리에 영향을 주지 않음)"""
+    stock_symbol = task[0]
+    try:
+        return stock_symbol, extract_symbol_events(*task)
+    except Exception as e:
+        print(f"이벤트 추출 실패 ({stock_symbol}): {e}")
+        return stock_symbol, None
+
+
+def collect_events(symbols, target_increase_pct_ratio, start_date=PRICE_HISTORY_START,
+                   bars_per_year=TRADING_DAYS_PER_YEAR, workers=PEERS_WORKERS):
+    """종목별 이벤트 열 배열 수집 (캐시에 없는 종목만 추출, 많으면 여러 프로세스로 나눠 처리)
+
+    반환값: ({심볼: 이벤트}, 가격 저장소에 데이터가 없는 심볼 목록)
+    """
+    events_by_symbol = {}
+    missing = []
+    pending = {} # 심볼 -> 캐시 키
+    for symbol in symbols:
+        version = store_mtime(symbol)
+        if version is None:
+            missing.append(symbol)
+            continue
+        cache_key = (symbol, version, f"{target_increase_pct_ratio:g}", start_date, bars_per_year)
+        events = event_cache.get(cache_key)
+        if events is None:
+            pending[symbol] = cache_key
+        else:
+            events_by_symbol[symbol] = events
+
+    tasks = [(symbol, target_increase_pct_ratio, start_date, bars_per_year) for symbol in pending]
+    results = None
+    if workers > 1 and len(tasks) >= PEERS_PROCESS_THRESHOLD:
+        chunksize = max(1, len(tasks) // (workers * 4))
+        pool = _get_process_pool(workers)
+        try:
+            results = list(pool.map(_extract_task, tasks, chunksize=chunksize))
+        except BrokenProcessPool as e:
+            print(f"이벤트 추출 프로세스 풀 오류, 현재 프로세스에서 처리: {e}")
+            _reset_process_pool(pool)
+    if results is None:
+        results = map(_extract_task, tasks)
+
+    for symbol, events in results:
+        if events is None:
+            missing.append(symbol)
+            continue
+        event_cache.set(pending[symbol], events)
+        events_by_symbol[symbol] = events
+
+    return events_by_symbol, missing
+
+
+def build_event_table(events_by_symbol):
+    """종목별 이벤트를 하나의 열 단위 테이블(symbol 인덱스 포함)로 결합"""
+    symbols = list(events_by_symbol)
+    columns = [events_by_symbol[symbol] for symbol in symbols]
+    return {
+        'symbols': symbols,
+        'symbol_idx': np.concatenate([np.full(len(events['band']), i, dtype=np.int32) for i, events in enumerate(columns)]
+                                     or [np.zeros(0, dtype=np.int32)]),
+        'band': np.concatenate([events['band'] for events in columns] or [np.zeros(0, dtype=np.int16)]),
+        'hit': np.concatenate([events['hit'] for events in columns] or [np.zeros(0, dtype=bool)]),
+        'days': np.concatenate([events['days'] for events in columns] or [np.zeros(0, dtype=np.int32)]),
+    }
+
+
+def aggregate_pooled(table):
+    """하락률 구간별로 전체 종목의 이벤트를 합쳐 성공률/평균 달성일 집계"""
+    bands = np.array(list(DRAWDOWN_BANDS))
+    band_pos = np.searchsorted(bands, table['band'])
+    hit = table['hit']
+
+    total = np.bincount(band_pos, minlength=len(bands))
+    success = np.bincount(band_pos, weights=hit, minlength=len(bands)).astype(int)
+    day_sums = np.bincount(band_pos, weights=np.where(hit, table['days'], 0), minlength=len(bands))
+    # 구간별로 이벤트가 하나 이상 있는 종목 수
+    symbol_pairs = np.unique(band_pos.astype(np.int64) * max(len(table['symbols']), 1) + table['symbol_idx'])
+    symbol_counts = np.bincount(symbol_pairs // max(len(table['symbols']), 1), minlength=len(bands))
+
+    rows = []
+    for i, band in enumerate(bands):
+        total_cases = int(total[i])
+        success_cases = int(success[i])
+        success_rate_low, success_rate_high = wilson_interval(success_cases, total_cases)
+        rows.append({
+            'band': int(band),
+            'successRate': round(success_cases / total_cases * 100, 1) if total_cases else 0,
+            'successCases': success_cases,
+            'failureCases': total_cases - success_cases,
+            'totalCases': total_cases,
+            'avgDays': round(float(day_sums[i] / success_cases), 1) if success_cases else None,
+            'successRateLow': success_rate_low,
+            'successRateHigh': success_rate_high,
+            'symbolCount': int(symbol_counts[i]),
+        })
+    return rows
+
+
+def pooled_analysis(symbols, target_increase_pct, history_mode='recent', workers=PEERS_WORKERS):
+    """피어 그룹 전체의 하락률 구간 이벤트를 합쳐 구간별 성공률 계산"""
+    start_date = PRICE_HISTORY_START if history_mode == 'recent' else None
+    events_by_symbol, missing = collect_events(symbols, target_increase_pct / 100, start_date, workers=workers)
+    table = build_event_table(events_by_symbol)
+    return {
+        'target_increase_pct': target_increase_pct,
+        'history_mode': history_mode,
+        'requested': len(symbols),
+        'included': table['symbols'],
+        'missing': missing,
+        'total_events': int(len(table['band'])),
+        'bands': aggregate_pooled(table),
+    }
+
+
+def main(argv=None):
+    from export import parse_symbol_list, top_ranked_symbols
+
+    parser = argparse.ArgumentParser(description="피어 그룹(여러 종목)의 하락률 구간 이벤트를 합친 성공률 분석")
+    parser.add_argument('symbols', nargs='*')
+    parser.add_argument('--top', type=int, help="tickers.json rank 기준 상위 N개 종목")
+    parser.add_argument('--target', type=float, default=3, help="목표 상승률 (%%, 기본값 3)")
+    parser.add_argument('--history', choices=('recent', 'full'), default='recent')
+    parser.add_argument('--workers', type=int, default=PEERS_WORKERS)
+    args = parser.parse_args(argv)
+
+    symbols = parse_symbol_list(list(args.symbols) + (top_ranked_symbols(args.top) if args.top else []))
+    if not symbols:
+        parser.error("종목을 하나 이상 지정해주세요.")
+    result = pooled_analysis(symbols, args.target, args.history, workers=args.workers)
+    json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+    print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
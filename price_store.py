@@ -0,0 +1,162 @@
+import os
+import re
+import tempfile
+import time
+
+import pandas as pd
+
+from cache import ByteLRUCache
+from market_data import PRICE_CACHE_TTL, download_bars
+
+try:
+    import pyarrow # noqa: F401 (Parquet 읽기/쓰기 엔진)
+    PRICE_STORE_FORMAT = 'parquet'
+except ImportError: # pyarrow가 없으면 CSV로 저장
+    PRICE_STORE_FORMAT = 'csv'
+
+PRICE_STORE_DIR = os.environ.get('PRICE_STORE_DIR', 'price_store') # 종목별 전체 기간 일봉 저장 위치
+PRICE_STORE_CACHE_MAX_BYTES = int(os.environ.get('PRICE_STORE_CACHE_MAX_BYTES', str(256 * 1024 * 1024))) # 메모리에 올려 둘 저장소 데이터 최대 크기
+
+DAILY_INTERVAL = '1d' # 일봉은 저장소 최상위, 분봉/시간봉은 간격별 하위 디렉터리에 저장
+
+# (심볼, 봉 간격, 파일 수정 시각) -> DataFrame (파일이 바뀌면 자동으로 새로 읽음)
+stored_bars_cache = ByteLRUCache(PRICE_STORE_CACHE_MAX_BYTES)
+
+
+def store_path(stock_symbol, interval=DAILY_INTERVAL):
+    safe_symbol = re.sub(r'[^A-Z0-9._-]', '_', stock_symbol.upper())
+    if interval == DAILY_INTERVAL:
+        return os.path.join(PRICE_STORE_DIR, f"{safe_symbol}.{PRICE_STORE_FORMAT}")
+    return os.path.join(PRICE_STORE_DIR, interval, f"{safe_symbol}.{PRICE_STORE_FORMAT}")
+
+
+def store_mtime(stock_symbol, interval=DAILY_INTERVAL):
+    """저장된 파일의 수정 시각 = 데이터 버전 (내용이 바뀌어 다시 쓸 때만 바뀜, 저장된 데이터가 없으면 None)"""
+    try:
+        return os.stat(store_path(stock_symbol, interval)).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def checked_marker_path(stock_symbol, interval=DAILY_INTERVAL):
+    return f"{store_path(stock_symbol, interval)}.checked"
+
+
+def store_checked_at(stock_symbol, interval=DAILY_INTERVAL):
+    """마지막으로 새 데이터를 확인한 시각 (초, 데이터 파일/확인 표시 파일 중 최근 값, 확인한 적이 없으면 None)"""
+    checked_at = None
+    for path in (store_path(stock_symbol, interval), checked_marker_path(stock_symbol, interval)):
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            continue
+        checked_at = mtime if checked_at is None else max(checked_at, mtime)
+    return checked_at
+
+
+def mark_checked(stock_symbol, interval=DAILY_INTERVAL):
+    """변경 없이 확인만 했을 때 표시 파일의 시각만 갱신 (데이터 파일 수정 시각은 그대로 두어 데이터 버전이 바뀌지 않음)
+
+    받은 데이터가 없는 종목도 표시해 두어, 확인 간격 안에는 공급자에 다시 요청하지 않도록 함
+    """
+    path = checked_marker_path(stock_symbol, interval)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a'):
+        pass
+    os.utime(path)
+
+
+def load_bars(stock_symbol, use_cache=True, interval=DAILY_INTERVAL):
+    """로컬 저장소에서 봉 데이터 읽기 (없으면 빈 DataFrame). 한 번만 읽을 데이터는 use_cache=False로 캐시를 건너뜀"""
+    mtime = store_mtime(stock_symbol, interval)
+    if mtime is None:
+        return pd.DataFrame()
+
+    cache_key = (stock_symbol, interval, mtime)
+    df = stored_bars_cache.get(cache_key)
+    if df is not None:
+        return df
+
+    path = store_path(stock_symbol, interval)
+    if PRICE_STORE_FORMAT == 'parquet':
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path, index_col=0, parse_dates=True)
+    if use_cache:
+        stored_bars_cache.set(cache_key, df)
+    return df
+
+
+def save_bars(stock_symbol, df, interval=DAILY_INTERVAL):
+    """봉 데이터를 로컬 저장소에 기록 (임시 파일에 쓴 뒤 교체해 읽는 쪽이 깨진 파일을 보지 않도록 함)
+
+    여러 워커가 같은 종목을 동시에 기록할 수 있으므로 임시 파일은 기록할 때마다 새 이름으로 만듦
+    """
+    path = store_path(stock_symbol, interval)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix='.tmp', dir=os.path.dirname(path))
+    os.close(fd)
+    try:
+        df = df.rename_axis('Date')
+        if PRICE_STORE_FORMAT == 'parquet':
+            df.to_parquet(tmp_path)
+        else:
+            df.to_csv(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def trim_sessions(df, keep_sessions):
+    """최근 keep_sessions개 거래일(봉 시각의 날짜 기준)의 봉만 남김"""
+    sessions = df.index.normalize()
+    return df[sessions >= sessions.unique()[-keep_sessions:][0]]
+
+
+def merge_into_store(stock_symbol, fresh, interval=DAILY_INTERVAL, keep_sessions=None):
+    """새로 받은 봉을 저장된 봉과 합쳐 기록. 새로 추가된 봉 수 반환
+
+    keep_sessions를 지정하면 최근 keep_sessions개 거래일만 남기고 오래된 봉은 버림 (장중 봉 저장소가 계속 커지지 않도록)
+    """
+    stored = load_bars(stock_symbol, interval=interval)
+    if stored.empty:
+        merged = fresh
+    elif fresh.empty:
+        merged = stored
+    else:
+        # 마지막 봉은 장중 값일 수 있으므로 새로 받은 값으로 덮어씀
+        merged = pd.concat([stored, fresh])
+        merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+
+    if merged.empty:
+        mark_checked(stock_symbol, interval) # 데이터가 없다는 결과도 확인 시각으로 남김
+        return 0
+    if keep_sessions:
+        merged = trim_sessions(merged, keep_sessions)
+    new_bar_count = len(merged) if stored.empty else int((merged.index > stored.index[-1]).sum())
+    if new_bar_count or not stored.equals(merged):
+        save_bars(stock_symbol, merged, interval)
+    else:
+        mark_checked(stock_symbol, interval) # 변경이 없어도 확인 시각은 갱신
+    return new_bar_count
+
+
+def update_bars(stock_symbol):
+    """저장된 마지막 봉 이후의 데이터만 내려받아 저장소에 추가. 새로 추가된 봉 수 반환"""
+    stored = load_bars(stock_symbol)
+    start = stored.index[-1].strftime('%Y-%m-%d') if not stored.empty else None
+    return merge_into_store(stock_symbol, download_bars(stock_symbol, start=start))
+
+
+def fetch_full_history(stock_symbol, max_age=PRICE_CACHE_TTL):
+    """로컬 저장소의 전체 기간 일봉 조회 (마지막 확인 후 max_age초가 지났으면 새 봉만 받아 갱신)"""
+    checked_at = store_checked_at(stock_symbol)
+    if checked_at is None or time.time() - checked_at > max_age:
+        try:
+            update_bars(stock_symbol)
+        except Exception as e:
+            if checked_at is None:
+                raise
+            print(f"가격 저장소 갱신 실패 ({stock_symbol}), 저장된 데이터 사용: {e}")
+    return load_bars(stock_symbol)
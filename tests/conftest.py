@@ -0,0 +1,46 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+os.chdir(ROOT_DIR) # tickers.json, templates 기준 위치
+
+# app 모듈을 import할 때 저장소/알림 DB가 작업 디렉터리에 생기지 않도록 임시 위치 사용
+_TEST_DATA_DIR = tempfile.mkdtemp(prefix='52high-tests-')
+os.environ.setdefault('PRICE_STORE_DIR', os.path.join(_TEST_DATA_DIR, 'price_store'))
+os.environ.setdefault('ALERT_DB_PATH', os.path.join(_TEST_DATA_DIR, 'alerts.db'))
+os.environ.setdefault('ALERT_SPOOL_DIR', os.path.join(_TEST_DATA_DIR, 'alert_spool'))
+
+
+def make_bars(seed=0, n=600, start='2020-01-02'):
+    """재현 가능한 가짜 일봉 (영업일 기준, 일간 변동 약 2%)"""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(start, periods=n)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        'Open': close,
+        'High': close * (1 + rng.uniform(0, 0.02, n)),
+        'Low': close * (1 - rng.uniform(0, 0.02, n)),
+        'Close': close,
+        'Adj Close': close,
+        'Volume': 1_000_000.0,
+    }, index=index)
+
+
+@pytest.fixture
+def bars():
+    return make_bars
+
+
+@pytest.fixture
+def price_store_dir(tmp_path, monkeypatch):
+    """테스트마다 빈 가격 저장소 사용"""
+    import price_store
+    monkeypatch.setattr(price_store, 'PRICE_STORE_DIR', str(tmp_path / 'price_store'))
+    price_store.stored_bars_cache.clear()
+    return tmp_path / 'price_store'
@@ -0,0 +1,117 @@
+import json
+import queue
+
+import pandas as pd
+import pytest
+
+import alerts
+import app as app_module
+import price_store
+from alerts import AlertEngine, QueueSink, WatchStore
+from breadth import BreadthTracker
+
+
+def append_bar(symbol, df, close):
+    """다음 영업일 봉 하나를 종가 close로 저장소에 추가"""
+    bar = df.tail(1).copy()
+    bar.index = [df.index[-1] + pd.offsets.BDay()]
+    bar[['Open', 'High', 'Low', 'Close', 'Adj Close']] = close
+    price_store.merge_into_store(symbol, bar)
+    return pd.concat([df, bar])
+
+
+@pytest.fixture
+def engine(tmp_path, bars, price_store_dir):
+    df = bars(seed=3, n=400)
+    price_store.save_bars('AAA', df)
+    watch_store = WatchStore(str(tmp_path / 'alerts.db'))
+    tracker = BreadthTracker([])
+    return AlertEngine(watch_store, tracker), df
+
+
+def test_alert_fires_once_and_rearms_after_recovery(engine):
+    engine, df = engine
+    high = df['High'].tail(252).max()
+    engine.watch_store.add_watch('AAA', 30)
+
+    df = append_bar('AAA', df, high * 0.65) # 35% 하락 -> 30% 구간 도달
+    fired = engine.check()
+    assert [alert['band'] for alert in fired] == [30]
+    assert not engine.watch_store.list_watches('AAA')[0]['armed']
+
+    df = append_bar('AAA', df, high * 0.64) # 구간에 머무는 동안은 다시 알리지 않음
+    assert engine.check() == []
+
+    df = append_bar('AAA', df, high * 0.9) # 구간 위로 회복하면 다시 감시
+    assert engine.check() == []
+    assert engine.watch_store.list_watches('AAA')[0]['armed']
+
+    append_bar('AAA', df, high * 0.6)
+    assert [alert['band'] for alert in engine.check()] == [30]
+
+
+def test_alert_fires_after_web_refresh_consumed_change(engine):
+    engine, df = engine
+    high = df['High'].tail(252).max()
+    engine.watch_store.add_watch('AAA', 30)
+    engine.check()
+
+    # 웹 요청(/breadth)이 같은 트래커를 먼저 갱신해도 알림 평가는 빠지지 않아야 함
+    append_bar('AAA', df, high * 0.65)
+    assert engine.tracker.refresh() == ['AAA']
+    assert [alert['symbol'] for alert in engine.check()] == ['AAA']
+
+
+def test_queue_sink_spools_before_full_queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(alerts, 'alert_queue', queue.Queue(maxsize=1))
+    monkeypatch.setattr(alerts, 'ALERT_SPOOL_DIR', str(tmp_path / 'spool'))
+    spool_path = tmp_path / 'spool' / 'alerts.jsonl'
+    sink = QueueSink('alerts.jsonl')
+    alert = {'symbol': 'AAA', 'as_of': '2024-01-02'}
+
+    sink.send(alert)
+    sink.send(alert) # 큐가 가득 차도 예외 없이 파일에는 기록
+    assert alerts.alert_queue.qsize() == 1
+    assert [json.loads(line) for line in spool_path.read_text(encoding='utf-8').splitlines()] == [alert, alert]
+
+
+@pytest.mark.parametrize('sink, sink_target', [
+    ('queue', 'app.py/../x'),
+    ('queue', '../alerts.jsonl'),
+    ('queue', '/tmp/anyfile.txt'),
+    ('queue', '.hidden'),
+    ('webhook', 'http://169.254.169.254/latest/meta-data'),
+    ('webhook', 'http://hooks.example.com@127.0.0.1/'),
+])
+def test_api_rejects_unsafe_sink_targets(sink, sink_target, monkeypatch):
+    monkeypatch.setattr(alerts, 'ALERT_WEBHOOK_ALLOWED_HOSTS', {'hooks.example.com'})
+    response = app_module.app.test_client().post('/api/alerts', json={
+        'symbol': 'AAA', 'band': 30, 'sink': sink, 'sink_target': sink_target})
+    assert response.status_code == 400
+
+
+def test_api_hides_sink_target(tmp_path, monkeypatch):
+    monkeypatch.setattr(alerts, 'ALERT_WEBHOOK_ALLOWED_HOSTS', {'hooks.example.com'})
+    monkeypatch.setattr(app_module, 'watch_store', WatchStore(str(tmp_path / 'alerts.db')))
+    client = app_module.app.test_client()
+    created = client.post('/api/alerts', json={'symbol': 'AAA', 'band': 30, 'sink': 'webhook',
+                                               'sink_target': 'https://hooks.example.com/secret-token'})
+    assert created.status_code == 201
+    assert 'sink_target' not in created.get_json()
+
+    listed = client.get('/api/alerts').get_json()
+    assert [watch['sink'] for watch in listed] == ['webhook']
+    assert 'secret-token' not in client.get('/api/alerts').get_data(as_text=True)
+    assert app_module.watch_store.list_watches()[0]['sink_target'] == 'https://hooks.example.com/secret-token'
+
+
+def test_watched_symbols_stay_out_of_breadth_universe(engine, monkeypatch):
+    engine, _ = engine
+    engine.watch_store.add_watch('AAA', 30)
+    monkeypatch.setattr(app_module.alert_engine, 'watch_store', engine.watch_store)
+    universe_size = len(app_module.breadth_tracker.tickers)
+
+    app_module.alert_engine.check()
+    assert app_module.alert_engine.tracker.snapshot('AAA') is not None
+    assert 'AAA' not in app_module.breadth_tracker.tickers
+    assert len(app_module.breadth_tracker.tickers) == universe_size
@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+
+from analysis import (BOOTSTRAP_SEED, BOOTSTRAP_STATS_KEYS, DRAWDOWN_BANDS, analysis_cache, block_bootstrap_band,
+                      cached_success_analysis, compute_success_analysis, summarize_band, wilson_interval)
+
+
+def reference_success_analysis(df, target_increase_pct_ratio):
+    """벡터화 이전의 반복문 구현 (비교 기준)"""
+    df_for_analysis = df.copy()
+    df_for_analysis['52W_High_Analysis'] = df_for_analysis['High'].rolling(window=252, min_periods=1).max()
+    df_for_analysis['Drawdown_Analysis'] = (df_for_analysis['Close'] - df_for_analysis['52W_High_Analysis']) / df_for_analysis['52W_High_Analysis']
+    df_for_analysis['Prev_Drawdown_Analysis'] = df_for_analysis['Drawdown_Analysis'].shift(1)
+
+    success_analysis_data = {}
+    for drawdown_pct_val in range(5, 95, 5):
+        drawdown_threshold = -drawdown_pct_val / 100
+        buy_points = df_for_analysis[
+            (df_for_analysis['Drawdown_Analysis'] <= drawdown_threshold) &
+            (df_for_analysis['Prev_Drawdown_Analysis'] > drawdown_threshold)
+        ]
+
+        success_cases = 0
+        total_cases = len(buy_points)
+        success_days = []
+        for buy_date in buy_points.index:
+            buy_price = df_for_analysis.loc[buy_date, 'Close']
+            target_price_for_success = buy_price * (1 + target_increase_pct_ratio)
+            idx = df_for_analysis.index.get_loc(buy_date)
+            if idx >= len(df_for_analysis) - 1:
+                continue
+            future_data = df_for_analysis.iloc[idx + 1:min(idx + 252 + 1, len(df_for_analysis))]
+            target_hit = future_data[future_data['High'] >= target_price_for_success]
+            if not target_hit.empty:
+                success_cases += 1
+                success_days.append(len(df_for_analysis.loc[buy_date:target_hit.index[0]]) - 1)
+
+        success_rate = (success_cases / total_cases * 100) if total_cases > 0 else 0
+        avg_days = sum(success_days) / len(success_days) if success_days else None
+        success_analysis_data[drawdown_pct_val] = {
+            'successRate': round(success_rate, 1),
+            'successCases': success_cases,
+            'failureCases': total_cases - success_cases,
+            'totalCases': total_cases,
+            'avgDays': round(avg_days, 1) if avg_days else None,
+        }
+    return success_analysis_data
+
+
+@pytest.mark.parametrize('seed', range(4))
+@pytest.mark.parametrize('target_increase_pct_ratio', [0.03, 0.1, 0.5])
+def test_vectorized_success_analysis_matches_loop(bars, seed, target_increase_pct_ratio):
+    df = bars(seed=seed, n=900)
+    expected = reference_success_analysis(df, target_increase_pct_ratio)
+    result = compute_success_analysis(df, target_increase_pct_ratio)
+
+    assert set(result) == set(DRAWDOWN_BANDS)
+    for band, stats in expected.items():
+        assert {key: result[band][key] for key in stats} == stats, band
+
+
+def test_cached_success_analysis_sees_intraday_update(bars):
+    analysis_cache.clear()
+    df = bars(seed=2, n=600)
+    first = cached_success_analysis('TEST', df, 0.03)
+    assert cached_success_analysis('TEST', df.copy(), 0.03) is first
+
+    # 같은 날짜의 마지막 봉이 급락하면 새 매수 시점이 생길 수 있으므로 다시 계산해야 함
+    updated = df.copy()
+    updated.iloc[-1, updated.columns.get_loc('Close')] *= 0.5
+    assert cached_success_analysis('TEST', updated, 0.03) is not first
+
+
+@pytest.mark.parametrize('success_cases, total_cases, expected', [
+    (10, 12, (55.2, 95.3)),
+    (0, 5, (0.0, 43.4)),
+    (5, 5, (56.6, 100.0)),
+    (0, 0, (None, None)),
+])
+def test_wilson_interval(success_cases, total_cases, expected):
+    assert wilson_interval(success_cases, total_cases) == expected
+
+
+def test_block_bootstrap_is_reproducible(bars):
+    rng = np.random.default_rng(0)
+    hit = rng.random(60) < 0.6
+    days = rng.integers(1, 200, 60)
+    first = block_bootstrap_band(hit, days, 500, np.random.default_rng(BOOTSTRAP_SEED))
+    assert block_bootstrap_band(hit, days, 500, np.random.default_rng(BOOTSTRAP_SEED)) == first
+    assert first['bootstrapSuccessRateLow'] <= hit.mean() * 100 <= first['bootstrapSuccessRateHigh']
+
+    df = bars(seed=1, n=900)
+    result = compute_success_analysis(df, 0.05, bootstrap_resamples=200)
+    assert compute_success_analysis(df, 0.05, bootstrap_resamples=200) == result
+
+
+def test_block_bootstrap_resamples_contiguous_runs():
+    # 27건이면 블록 길이는 3. 연속한 3건에는 성공(3의 배수 위치)이 항상 정확히 하나씩 들어 있으므로
+    # 블록 단위로 뽑으면 모든 재표본의 성공률이 1/3로 같음 (한 건씩 뽑으면 재표본마다 달라짐)
+    hit = np.arange(27) % 3 == 0
+    days = np.full(27, 10)
+    result = block_bootstrap_band(hit, days, 1000, np.random.default_rng(BOOTSTRAP_SEED))
+    assert result['bootstrapSuccessRateLow'] == result['bootstrapSuccessRateHigh'] == 33.3
+    assert result['bootstrapAvgDaysLow'] == result['bootstrapAvgDaysHigh'] == 10
+
+
+def test_band_without_success_has_no_average_days():
+    hit = np.zeros(4, dtype=bool)
+    days = np.ones(4, dtype=int)
+    summary = summarize_band(hit, days, bootstrap_resamples=100, rng=np.random.default_rng(BOOTSTRAP_SEED))
+    assert summary['successRate'] == 0
+    assert summary['avgDays'] is None
+    assert (summary['successRateLow'], summary['successRateHigh']) == wilson_interval(0, 4)
+    assert summary['bootstrapAvgDaysLow'] is None and summary['bootstrapAvgDaysHigh'] is None
+
+    empty = summarize_band(np.zeros(0, dtype=bool), np.zeros(0, dtype=int), bootstrap_resamples=100,
+                           rng=np.random.default_rng(BOOTSTRAP_SEED))
+    assert empty['totalCases'] == 0 and empty['successRateLow'] is None
+    assert all(empty[key] is None for key in BOOTSTRAP_STATS_KEYS)
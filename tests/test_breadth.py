@@ -0,0 +1,75 @@
+import pandas as pd
+
+import price_store
+from breadth import BREADTH_BANDS, BreadthTracker, build_summary, drawdown_band, rank_bucket_label
+
+
+def test_unchanged_update_keeps_data_version(bars, price_store_dir, monkeypatch):
+    df = bars(seed=1, n=400)
+    price_store.save_bars('AAA', df)
+    price_store.save_bars('BBB', bars(seed=2, n=400))
+    tracker = BreadthTracker([{'symbol': 'AAA', 'rank': 1}, {'symbol': 'BBB', 'rank': 2}])
+    assert sorted(tracker.refresh()) == ['AAA', 'BBB']
+
+    # 새 봉이 없는 갱신은 확인 시각만 바꾸고 데이터 버전은 그대로
+    monkeypatch.setattr(price_store, 'download_bars', lambda stock_symbol, start=None: df.tail(1))
+    version = price_store.store_mtime('AAA')
+    assert price_store.update_bars('AAA') == 0
+    assert price_store.store_mtime('AAA') == version
+    assert price_store.store_checked_at('AAA') is not None
+    assert tracker.refresh() == []
+
+    # 새 봉이 생긴 종목만 다시 계산
+    next_bar = df.tail(1).copy()
+    next_bar.index = [df.index[-1] + pd.offsets.BDay()]
+    monkeypatch.setattr(price_store, 'download_bars', lambda stock_symbol, start=None: next_bar)
+    assert price_store.update_bars('AAA') == 1
+    assert tracker.refresh() == ['AAA']
+    assert tracker.snapshot('AAA')['as_of'] == next_bar.index[0].strftime('%Y-%m-%d')
+
+
+def test_background_refresh_warms_summary(bars, price_store_dir):
+    price_store.save_bars('AAA', bars(seed=1, n=400))
+    tracker = BreadthTracker([{'symbol': 'AAA', 'rank': 1}])
+    tracker.start_background_refresh().join()
+    assert tracker.summary()['tracked'] == 1
+    assert tracker.refresh_if_stale() == []
+
+
+def make_snapshot(symbol, rank, drawdown_pct, prev_band=None, as_of='2024-01-05'):
+    band = drawdown_band(drawdown_pct)
+    crossed = None
+    if prev_band is not None and prev_band != band:
+        crossed = 'down' if band > prev_band else 'up'
+    return {'symbol': symbol, 'name': symbol, 'rank': rank, 'rank_bucket': rank_bucket_label(rank), 'as_of': as_of,
+            'drawdown_pct': drawdown_pct, 'band': band, 'prev_band': prev_band, 'crossed': crossed}
+
+
+def test_build_summary_counts_bands_buckets_and_crossings():
+    snapshots = [
+        make_snapshot('A', 1, 2.0),
+        make_snapshot('B', 5, 12.0, prev_band=5),     # 더 깊은 구간으로 이동
+        make_snapshot('G', 3, 11.0, prev_band=15),    # 회복, B와 같은 구간이지만 순위가 높음
+        make_snapshot('C', 20, 31.0, prev_band=25),   # 더 깊은 구간으로 이동
+        make_snapshot('D', 30, 14.0, prev_band=10),   # 구간 안에서만 움직임
+        make_snapshot('E', 40, 8.0, prev_band=10),    # 회복 (위 구간으로 이동)
+        make_snapshot('F', None, 99.0, prev_band=50, as_of='2024-01-04'), # 기준일이 지난 종목은 목록에서 제외
+    ]
+    summary = build_summary(snapshots, universe_size=10)
+
+    assert summary['as_of'] == '2024-01-05'
+    assert (summary['universe_size'], summary['tracked']) == (10, 7)
+    histogram = {row['band']: row['count'] for row in summary['band_histogram']}
+    assert histogram == {**dict.fromkeys(BREADTH_BANDS, 0), 0: 1, 5: 1, 10: 3, 30: 1, 90: 1}
+    assert summary['band_histogram'][2]['label'] == '10~15%'
+
+    buckets = {bucket['label']: bucket for bucket in summary['rank_buckets']}
+    assert (buckets['1-10']['count'], buckets['1-10']['median_drawdown_pct']) == (3, 11.0)
+    assert (buckets['11-50']['count'], buckets['11-50']['median_drawdown_pct']) == (3, 14.0)
+    assert buckets['51-100']['count'] == 0 and buckets['51-100']['median_drawdown_pct'] is None
+    assert {row['band']: row['count'] for row in buckets['11-50']['bands'] if row['count']} == {5: 1, 10: 1, 30: 1}
+    assert sum(bucket['count'] for bucket in buckets.values()) == 6 # 순위 없는 종목은 순위 구간에서 제외
+
+    # 기준일에 구간이 바뀐 종목만, 깊은 구간부터 (같은 구간이면 순위 순)
+    assert [snapshot['symbol'] for snapshot in summary['crossed_today']] == ['C', 'G', 'B', 'E']
+    assert [snapshot['symbol'] for snapshot in summary['symbols']] == ['F', 'C', 'D', 'B', 'G', 'E', 'A']
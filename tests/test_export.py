@@ -0,0 +1,84 @@
+import io
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+import app as app_module
+import export
+from analysis import analysis_cache
+from export import EXPORT_FIELDNAMES, iter_csv, iter_parquet, read_export
+
+
+@pytest.fixture
+def fake_data(bars, monkeypatch):
+    """종목마다 다른 가짜 일봉, MISSING 종목은 데이터 없음"""
+    def fetch_price_history(stock_symbol):
+        if stock_symbol == 'MISSING':
+            return pd.DataFrame()
+        return bars(seed=sum(map(ord, stock_symbol)), n=600)
+
+    monkeypatch.setattr(export, 'fetch_price_history', fetch_price_history)
+    monkeypatch.setattr(export, 'fetch_stock_profile', lambda stock_symbol: {'stock_name': f"{stock_symbol} Inc."})
+    analysis_cache.clear()
+
+
+SYMBOLS = ['AAA', 'BBB', 'MISSING', 'CCC']
+
+
+def test_csv_round_trip(fake_data, tmp_path):
+    path = tmp_path / 'export.csv'
+    path.write_text(''.join(iter_csv(SYMBOLS, 3, batch_size=2)), encoding='utf-8')
+
+    df = read_export(str(path))
+    assert list(df.columns) == EXPORT_FIELDNAMES
+    assert list(dict.fromkeys(df['symbol'])) == SYMBOLS # 입력 순서 유지
+    assert df.loc[df['symbol'] == 'MISSING', 'error'].notna().all()
+    assert df.loc[df['symbol'] != 'MISSING', 'error'].isna().all()
+    assert (df.loc[df['symbol'] == 'AAA', 'name'] == 'AAA Inc.').all()
+
+    chunks = list(read_export(str(path), chunksize=5))
+    assert [len(chunk) for chunk in chunks[:-1]] == [5] * (len(chunks) - 1)
+    assert list(pd.concat(chunks, ignore_index=True)['symbol']) == list(df['symbol'])
+
+
+def test_parquet_round_trip_writes_row_group_per_batch(fake_data, tmp_path):
+    path = tmp_path / 'export.parquet'
+    path.write_bytes(b''.join(iter_parquet(SYMBOLS, 3, batch_size=2)))
+
+    parquet_file = pq.ParquetFile(str(path))
+    assert parquet_file.num_row_groups == 2
+    assert parquet_file.schema_arrow.names == EXPORT_FIELDNAMES
+
+    df = read_export(str(path))
+    csv_df = pd.read_csv(io.StringIO(''.join(iter_csv(SYMBOLS, 3, batch_size=2))))
+    assert list(df['symbol']) == list(csv_df['symbol'])
+    pd.testing.assert_series_equal(df['successRate'], csv_df['successRate'])
+    assert sum(len(chunk) for chunk in read_export(str(path), chunksize=7)) == len(df)
+
+
+@pytest.mark.parametrize('query', [
+    'symbols=AAA&format=xlsx',
+    'symbols=AAA&target=abc',
+    'symbols=AAA&target=0',
+    'symbols=AAA&bootstrap=-1',
+    'symbols=',
+])
+def test_export_endpoint_rejects_bad_input(query):
+    response = app_module.app.test_client().get(f'/export?{query}')
+    assert response.status_code == 400
+    assert response.get_json()['error']
+
+
+def test_export_endpoint_rejects_too_many_symbols(monkeypatch):
+    monkeypatch.setattr(app_module, 'MAX_EXPORT_SYMBOLS', 2)
+    response = app_module.app.test_client().post('/export', json={'symbols': 'AAA,BBB,CCC'})
+    assert response.status_code == 400
+
+
+def test_export_endpoint_streams_csv(fake_data):
+    response = app_module.app.test_client().get('/export?symbols=aaa,bbb&target=3')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    df = pd.read_csv(io.BytesIO(response.data))
+    assert set(df['symbol']) == {'AAA', 'BBB'}
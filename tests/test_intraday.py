@@ -0,0 +1,89 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import intraday
+import price_store
+from analysis import TRADING_DAYS_PER_YEAR
+from intraday import (INTRADAY_INTERVALS, FixtureIntradayProvider, IntradayFeed, RollingHighTracker, session_keys,
+                      update_intraday_bars)
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'fixtures', 'intraday')
+
+
+def test_rolling_high_tracker_matches_rolling_max(bars):
+    df = bars(seed=5, n=700)
+    expected = df['High'].rolling(TRADING_DAYS_PER_YEAR, min_periods=1).max()
+    tracker = RollingHighTracker()
+    rng = np.random.default_rng(0)
+    for session, high, close in zip(df.index, df['High'], df['Close']):
+        # 하루에 여러 틱, 마지막 고가가 그날 고가가 되도록 나눠서 반영
+        for tick_high in sorted(rng.uniform(close, high, 3)):
+            tracker.update(session, tick_high, close)
+        tracker.update(session, high, close)
+        assert tracker.high_52_week == expected[session]
+    assert tracker.update(df.index[-2], 1e9) is False # 이전 거래일 틱은 무시
+
+
+def test_intraday_feed_from_fixture(price_store_dir):
+    provider = FixtureIntradayProvider(FIXTURE_DIR)
+    feed = IntradayFeed('DEMO', '1m', provider)
+    minute_bars = provider.fetch_bars('DEMO', '1m')
+    assert feed.refresh() == len(minute_bars)
+
+    daily = provider.fetch_bars('DEMO', '1d')
+    session_highs = pd.concat([daily['High'], minute_bars['High'].groupby(session_keys(minute_bars.index)).max()])
+    snapshot = feed.snapshot()
+    assert snapshot['high_52_week'] == round(session_highs.tail(TRADING_DAYS_PER_YEAR).max(), 4)
+    assert snapshot['price'] == minute_bars['Close'].iloc[-1]
+    assert snapshot['as_of'] == minute_bars.index[-1].isoformat()
+    assert feed.refresh() == 0 # 갱신 간격 안에서는 저장소를 다시 읽지 않음
+
+
+def test_intraday_store_keeps_provider_window(bars, price_store_dir):
+    class ListProvider:
+        def __init__(self, frames):
+            self.frames = frames
+
+        def fetch_bars(self, stock_symbol, interval):
+            return self.frames.pop(0)
+
+    keep_sessions = INTRADAY_INTERVALS['1m']['keep_sessions']
+    index = pd.DatetimeIndex([day + pd.Timedelta(hours=9, minutes=30 + minute)
+                              for day in pd.bdate_range('2024-01-08', periods=keep_sessions + 3)
+                              for minute in range(10)]).tz_localize('America/New_York')
+    minutes = bars(seed=2, n=len(index)).set_axis(index)
+    first, second = minutes.iloc[:-20], minutes.iloc[-10 * keep_sessions:]
+    provider = ListProvider([first, second, second])
+
+    update_intraday_bars('DEMO', '1m', provider)
+    stored = price_store.load_bars('DEMO', interval='1m')
+    assert session_keys(stored.index).nunique() == keep_sessions
+
+    assert update_intraday_bars('DEMO', '1m', provider) == 20
+    stored = price_store.load_bars('DEMO', interval='1m')
+    assert stored.equals(second.rename_axis('Date'))
+
+    # 같은 기간을 다시 받아도 잘려 나간 봉이 없으므로 저장소는 다시 쓰지 않음
+    version = price_store.store_mtime('DEMO', '1m')
+    assert update_intraday_bars('DEMO', '1m', provider) == 0
+    assert price_store.store_mtime('DEMO', '1m') == version
+
+
+def test_unknown_symbol_is_not_refetched_every_poll(price_store_dir, monkeypatch):
+    class EmptyProvider:
+        calls = 0
+
+        def fetch_bars(self, stock_symbol, interval):
+            self.calls += 1
+            return pd.DataFrame()
+
+    provider = EmptyProvider()
+    monkeypatch.setattr(intraday, 'get_provider', lambda name=None: provider)
+    intraday.live_feeds.clear()
+
+    assert intraday.get_live_snapshot('NOPE', '1m') is None
+    assert intraday.get_live_snapshot('NOPE', '1m') is None
+    assert provider.calls == 1 # 갱신 간격 안에서는 빈 결과도 다시 요청하지 않음
+    assert len(intraday.live_feeds) == 0
@@ -0,0 +1,52 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import loadtest
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """모든 요청에 0.1초 뒤 빈 200 응답"""
+    protocol_version = 'HTTP/1.1'
+    started = []
+
+    def respond(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self.rfile.read(length)
+        SlowHandler.started.append(time.perf_counter())
+        time.sleep(0.1)
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    do_GET = do_POST = respond
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def slow_server():
+    SlowHandler.started = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SlowHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_stage_stops_sending_requests_when_duration_ends(slow_server):
+    concurrency = 4
+    started = time.perf_counter()
+    stage = loadtest.run_stage('127.0.0.1', slow_server.server_port, concurrency, 1, ['AAPL', 'MSFT'],
+                               loadtest.zipf_weights(2), seed=1, think_time_scale=0)
+    stage_end = started + stage['duration_s']
+
+    assert stage['duration_s'] == pytest.approx(1, abs=0.1)
+    assert stage['errors'] == 0
+    assert stage['late'] <= concurrency # 종료 시점에 진행 중이던 요청만
+    # 종료 후에는 새 요청을 보내지 않음 (시각 비교 여유 0.1초)
+    assert all(request_started < stage_end + 0.1 for request_started in SlowHandler.started)
@@ -0,0 +1,28 @@
+import pandas as pd
+
+from market_data import get_resampled_bars, resample_bars, resampled_bars_cache
+
+
+def test_in_progress_period_is_labelled_with_last_bar_date(bars):
+    df = bars(n=600)
+    df = df[df.index <= '2022-04-20'] # 수요일: 주/월 모두 진행 중
+
+    weekly = resample_bars(df, 'weekly')
+    monthly = resample_bars(df, 'monthly')
+
+    assert weekly.index[-1] == pd.Timestamp('2022-04-20')
+    assert monthly.index[-1] == pd.Timestamp('2022-04-20')
+    assert weekly.index[-2] == pd.Timestamp('2022-04-15') # 완료된 주는 금요일 기준 그대로
+    assert weekly.index.is_monotonic_increasing
+    assert weekly['Close'].iloc[-1] == df['Close'].iloc[-1]
+
+
+def test_resampled_cache_sees_last_bar_update(bars):
+    resampled_bars_cache.clear()
+    df = bars(n=300)
+    first = get_resampled_bars('TEST', df, 'weekly')
+    assert get_resampled_bars('TEST', df.copy(), 'weekly') is first
+
+    updated = df.copy()
+    updated.iloc[-1, updated.columns.get_loc('High')] *= 2
+    assert get_resampled_bars('TEST', updated, 'weekly')['High'].iloc[-1] == updated['High'].iloc[-1]
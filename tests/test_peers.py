@@ -0,0 +1,44 @@
+from concurrent.futures.process import BrokenProcessPool
+
+import peers
+import price_store
+
+
+def test_process_pool_matches_in_process(bars, monkeypatch):
+    # 작업 프로세스는 환경 변수의 기본 저장소 위치를 읽으므로 임시 저장소(price_store_dir)를 쓰지 않음
+    symbols = [f"PEER{i}" for i in range(4)]
+    for i, symbol in enumerate(symbols):
+        price_store.save_bars(symbol, bars(seed=10 + i, n=500))
+    monkeypatch.setattr(peers, 'PEERS_PROCESS_THRESHOLD', 2)
+
+    try:
+        pooled = peers.pooled_analysis(symbols, 3, workers=2)
+    finally:
+        if peers._process_pool is not None:
+            peers._reset_process_pool(peers._process_pool)
+    peers.event_cache.clear()
+    in_process = peers.pooled_analysis(symbols, 3, workers=1)
+    assert pooled == in_process
+    assert pooled['included'] == symbols
+
+
+def test_broken_process_pool_falls_back_and_resets(bars, price_store_dir, monkeypatch):
+    class BrokenPool:
+        shut_down = False
+
+        def map(self, *args, **kwargs):
+            raise BrokenProcessPool("작업 프로세스 종료")
+
+        def shutdown(self, wait=True, cancel_futures=False):
+            self.shut_down = True
+
+    broken = BrokenPool()
+    monkeypatch.setattr(peers, '_process_pool', broken)
+    monkeypatch.setattr(peers, 'PEERS_PROCESS_THRESHOLD', 1)
+    price_store.save_bars('AAA', bars(seed=1, n=500))
+    peers.event_cache.clear()
+
+    result = peers.pooled_analysis(['AAA'], 3, workers=2)
+    assert result['included'] == ['AAA']
+    assert peers._process_pool is None
+    assert broken.shut_down
@@ -0,0 +1,24 @@
+import os
+import threading
+
+import price_store
+
+
+def test_concurrent_saves_never_publish_partial_file(bars, price_store_dir):
+    frames = [bars(seed=seed, n=2000) for seed in range(4)]
+    start = threading.Barrier(len(frames))
+
+    def save(df):
+        start.wait()
+        for _ in range(5):
+            price_store.save_bars('AAA', df)
+
+    threads = [threading.Thread(target=save, args=(df,)) for df in frames]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stored = price_store.load_bars('AAA', use_cache=False)
+    assert any(stored.equals(df.rename_axis('Date')) for df in frames)
+    assert os.listdir(price_store_dir) == [os.path.basename(price_store.store_path('AAA'))] # 임시 파일이 남지 않음
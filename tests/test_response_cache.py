@@ -0,0 +1,75 @@
+import pytest
+
+import app as app_module
+from analysis import analysis_cache
+
+
+@pytest.fixture
+def client(bars, monkeypatch):
+    """가격/종목 정보 조회를 가짜 데이터로 바꾼 테스트 클라이언트 (현재 데이터는 data['df'], 순이익은 data['net_income']로 교체 가능)"""
+    data = {'df': bars(seed=3, n=600), 'net_income': None}
+    monkeypatch.setattr(app_module, 'fetch_price_history', lambda stock_symbol: data['df'])
+    monkeypatch.setattr(app_module, 'fetch_stock_profile', lambda stock_symbol: {
+        'stock_name': f"{stock_symbol} Inc.",
+        'operating_income_formatted': None,
+        'net_income_formatted': data['net_income'],
+        'latest_quarter_date_formatted': None,
+    })
+    app_module.response_cache.clear()
+    analysis_cache.clear()
+    client = app_module.app.test_client()
+    client.data = data
+    return client
+
+
+def with_last_close_changed(df, factor):
+    """같은 날짜의 마지막 봉 값만 바뀐 (장중 갱신) 데이터"""
+    df = df.copy()
+    df.iloc[-1, df.columns.get_loc('Close')] *= factor
+    return df
+
+
+def test_repeated_get_uses_cache_and_etag(client):
+    first = client.get('/?stock_symbol=TEST&target=3')
+    assert first.status_code == 200
+    assert first.headers['ETag']
+
+    second = client.get('/?stock_symbol=TEST&target=3')
+    assert second.data == first.data
+    assert second.headers['ETag'] == first.headers['ETag']
+
+    conditional = client.get('/?stock_symbol=TEST&target=3', headers={'If-None-Match': first.headers['ETag']})
+    assert conditional.status_code == 304
+
+
+def test_intraday_change_of_last_bar_invalidates_cache(client):
+    first = client.get('/?stock_symbol=TEST&target=3')
+
+    client.data['df'] = with_last_close_changed(client.data['df'], 0.8)
+    second = client.get('/?stock_symbol=TEST&target=3')
+    assert second.status_code == 200
+    assert second.data != first.data
+    assert second.headers['ETag'] != first.headers['ETag']
+
+    conditional = client.get('/?stock_symbol=TEST&target=3', headers={'If-None-Match': first.headers['ETag']})
+    assert conditional.status_code == 200
+
+
+def test_cached_page_expires_after_max_age(client, monkeypatch):
+    # 재무 데이터 조회가 일시적으로 실패한 페이지는 데이터가 그대로여도 max_age가 지나면 다시 렌더링
+    client.get('/?stock_symbol=TEST&target=3')
+    client.data['net_income'] = '1.23억'
+    assert '1.23억' not in client.get('/?stock_symbol=TEST&target=3').get_data(as_text=True)
+
+    monkeypatch.setattr(app_module.response_cache, 'max_age', -1)
+    assert '1.23억' in client.get('/?stock_symbol=TEST&target=3').get_data(as_text=True)
+
+
+def test_response_cache_key_tracks_data_version(bars):
+    df = bars(seed=1)
+    key = app_module.response_cache_key('TEST', 3, 'recent', 'daily', 0, None, df)
+
+    assert key == app_module.response_cache_key('TEST', 3.0, 'recent', 'daily', 0, None, df.copy())
+    assert key != app_module.response_cache_key('TEST', 5, 'recent', 'daily', 0, None, df)
+    assert key != app_module.response_cache_key('TEST', 3, 'recent', 'daily', 0, None, with_last_close_changed(df, 0.8))
+    assert key != app_module.response_cache_key('TEST', 3, 'recent', 'daily', 0, None, df.iloc[:-1])